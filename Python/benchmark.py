@@ -0,0 +1,390 @@
+import os
+import sys
+import tempfile
+import tracemalloc
+from time import perf_counter
+from random import randint
+import parallel
+from river_crossing import RiverCrossing
+from graph import DirectedGraph, GraphError, random_graph, erdos_renyi_graph, scale_free_graph, grid_graph, all_pairs_shortest_paths, biconnected_decomposition, strongly_connected_components, read_graph_from_file, save_binary, load_binary, write_graph_to_file, accessible, shortest_walk, reachability, batch_shortest_paths, single_source_shortest_paths, IncrementalSCC, strongly_connected_labels, condensation, weakly_connected_labels, minimum_spanning_forest, topological_sort, schedule, max_flow
+
+def timed(build):
+    # returns the result of build() and the time it needed
+    start = perf_counter()
+    result = build()
+    return result, perf_counter() - start
+
+def retained_memory(build) -> int:
+    # returns the number of bytes still allocated by the result of build()
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+def traverse(g) -> int:
+    # touches every edge once
+    total = 0
+    for vertex1 in g.vertices():
+        for vertex2 in g.outbound(vertex1):
+            total += 1
+    return total
+
+def bench_freeze(vertices: int = 20000, edges: int = 200000):
+    print(f"freeze: {vertices} vertices, {edges} edges")
+    g, elapsed = timed(lambda: random_graph(vertices, edges))
+    print(f"  DirectedGraph build: {elapsed:.3f}s")
+    frozen, elapsed = timed(g.freeze)
+    print(f"  freeze: {elapsed:.3f}s")
+    print(f"  DirectedGraph memory: {retained_memory(frozen.thaw) / edges:.1f} bytes/edge")
+    print(f"  FrozenDirectedGraph memory: {retained_memory(g.freeze) / edges:.1f} bytes/edge")
+    for name, graph in (("DirectedGraph", g), ("FrozenDirectedGraph", frozen)):
+        start = perf_counter()
+        traverse(graph)
+        print(f"  {name} traversal: {perf_counter() - start:.3f}s")
+
+def star_graph(hubs: int, leaves: int) -> DirectedGraph:
+    # every hub is connected both ways to every leaf
+    g = DirectedGraph(hubs + leaves)
+    for hub in range(hubs):
+        for leaf in range(hubs, hubs + leaves):
+            g.add_edge(hub, leaf, 1)
+            g.add_edge(leaf, hub, 1)
+    return g
+
+def bench_remove_vertex(hubs: int = 10, leaves: int = 20000):
+    print(f"remove_vertex: {hubs} hubs connected both ways to {leaves} leaves")
+    g = star_graph(hubs, leaves)
+    start = perf_counter()
+    for leaf in range(hubs, hubs + leaves):
+        g.remove_vertex(leaf)
+    print(f"  remove all leaves: {perf_counter() - start:.3f}s")
+    g = star_graph(hubs, leaves)
+    start = perf_counter()
+    for hub in range(hubs):
+        g.remove_vertex(hub)
+    print(f"  remove all hubs: {perf_counter() - start:.3f}s")
+
+def bench_all_pairs(vertices: int = 300):
+    for edges in (vertices * 4, vertices * vertices // 4, vertices * vertices):
+        print(f"all_pairs_shortest_paths: {vertices} vertices, {edges} edges")
+        g = random_graph(vertices, edges)
+        for vertex1, vertex2, cost in list(g.edges()):
+            g.modify_cost(vertex1, vertex2, abs(cost))
+        for method in ("johnson", "floyd", "auto"):
+            _, elapsed = timed(lambda: all_pairs_shortest_paths(g, method))
+            print(f"  {method}: {elapsed:.3f}s")
+
+def random_undirected_graph(vertices: int, edges: int) -> DirectedGraph:
+    # inserts every edge in both directions like read_graph_from_file
+    g = DirectedGraph(vertices)
+    count = 0
+    while count < edges:
+        vertex1 = randint(0, vertices - 1)
+        vertex2 = randint(0, vertices - 1)
+        if vertex1 != vertex2 and g.add_edge(vertex1, vertex2, 1):
+            g.add_edge(vertex2, vertex1, 1)
+            count += 1
+    return g
+
+def bench_biconnected(sizes = ((50000, 100000), (200000, 1000000))):
+    for vertices, edges in sizes:
+        print(f"biconnected_decomposition: {vertices} vertices, {edges} undirected edges")
+        g = random_undirected_graph(vertices, edges)
+        (blocks, articulation_points, bridges), elapsed = timed(lambda: biconnected_decomposition(g))
+        print(f"  {elapsed:.3f}s, {len(blocks)} blocks, {len(articulation_points)} articulation points, {len(bridges)} bridges")
+
+def write_edge_list(filename: str, vertices: int, edges: int, cost_range: tuple = (-100, 100)):
+    with open(filename, "w") as f:
+        f.write(f"{vertices} {edges}\n")
+        for _ in range(edges):
+            f.write(f"{randint(0, vertices - 1)} {randint(0, vertices - 1)} {randint(*cost_range)}\n")
+
+def bench_read(vertices: int = 100000, edges: int = 1000000):
+    print(f"read_graph_from_file: {vertices} vertices, {edges} lines")
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "graph.txt")
+        write_edge_list(filename, vertices, edges)
+        for undirected in (False, True):
+            g, elapsed = timed(lambda: read_graph_from_file(filename, undirected))
+            print(f"  undirected={undirected}: {elapsed:.3f}s, {edges / elapsed:.0f} lines/s, {g.edge_count()} edges")
+
+def bench_binary(vertices: int = 100000, edges: int = 1000000):
+    print(f"binary format: {vertices} vertices, {edges} edges")
+    g = random_graph(vertices, edges)
+    with tempfile.TemporaryDirectory() as directory:
+        text = os.path.join(directory, "graph.txt")
+        binary = os.path.join(directory, "graph.bin")
+        _, elapsed = timed(lambda: write_graph_to_file(text, g))
+        print(f"  write text: {elapsed:.3f}s")
+        _, elapsed = timed(lambda: save_binary(binary, g))
+        print(f"  save binary: {elapsed:.3f}s")
+        _, elapsed = timed(lambda: read_graph_from_file(text, False))
+        print(f"  read text: {elapsed:.3f}s")
+        loaded, elapsed = timed(lambda: load_binary(binary))
+        print(f"  load binary: {elapsed * 1000:.2f}ms")
+        _, elapsed = timed(lambda: traverse(loaded))
+        print(f"  first traversal of the mapped graph: {elapsed:.3f}s")
+
+def bench_write(vertices: int = 1000000, edges: int = 10000000):
+    print(f"write_graph_to_file: {vertices} vertices, {edges} edges")
+    g = random_graph(vertices, edges).freeze()
+    with tempfile.TemporaryDirectory() as directory:
+        for name in ("graph.txt", "graph.txt.gz"):
+            filename = os.path.join(directory, name)
+            _, elapsed = timed(lambda: write_graph_to_file(filename, g))
+            print(f"  {name}: {elapsed:.3f}s, {edges / elapsed:.0f} edges/s, {os.path.getsize(filename)} bytes")
+
+def bench_generators(vertices: int = 100000, edges: int = 1000000):
+    print(f"generators: {vertices} vertices, about {edges} edges")
+    for name, build in (
+        ("random_graph", lambda frozen: random_graph(vertices, edges, 1, frozen)),
+        ("random_graph near complete", lambda frozen: random_graph(1000, 990000, 1, frozen)),
+        ("erdos_renyi_graph", lambda frozen: erdos_renyi_graph(vertices, edges / vertices ** 2, 1, frozen)),
+        ("scale_free_graph", lambda frozen: scale_free_graph(vertices, edges // vertices, 1, frozen)),
+        ("grid_graph", lambda frozen: grid_graph(vertices // 1000, 1000, 1, frozen)),
+    ):
+        for frozen in (False, True):
+            g, elapsed = timed(lambda: build(frozen))
+            print(f"  {name} frozen={frozen}: {elapsed:.3f}s, {g.edge_count()} edges")
+
+def bench_copy(vertices: int = 100000, edges: int = 1000000, copies: int = 100):
+    print(f"copy_graph: {vertices} vertices, {edges} edges, {copies} copies with one edit each")
+    g = random_graph(vertices, edges, 1)
+    start = perf_counter()
+    for i in range(copies):
+        copy = g.copy_graph()
+        copy.add_edge(i, (i + 1) % vertices, 1) or copy.remove_edge(i, (i + 1) % vertices)
+    elapsed = perf_counter() - start
+    print(f"  {elapsed / copies * 1000:.2f}ms per copy and edit")
+
+def bench_components(vertices: int = 100000):
+    print(f"strongly_connected_components: path of {vertices} vertices (all SCCs are singletons)")
+    g = DirectedGraph(vertices)
+    for vertex in range(vertices - 1):
+        g.add_edge(vertex, vertex + 1, 1)
+    components, elapsed = timed(lambda: strongly_connected_components(g))
+    print(f"  views: {elapsed:.3f}s")
+    _, elapsed = timed(lambda: [component.materialize() for component in components])
+    print(f"  materializing all of them: {elapsed:.3f}s")
+
+def bench_core(vertices: int = 100000, edges: int = 1000000):
+    print(f"DirectedGraph core operations: {vertices} vertices, {edges} edges")
+    pairs = list({(randint(0, vertices - 1), randint(0, vertices - 1)) for _ in range(edges)})
+
+    def build():
+        g = DirectedGraph(vertices)
+        for vertex1, vertex2 in pairs:
+            g.add_edge(vertex1, vertex2, 1)
+        return g
+
+    g, elapsed = timed(build)
+    print(f"  add_edge: {len(pairs) / elapsed:.0f} ops/s")
+    start = perf_counter()
+    for vertex1, vertex2 in pairs:
+        g.get_cost(vertex1, vertex2)
+    print(f"  get_cost: {len(pairs) / (perf_counter() - start):.0f} ops/s")
+    start = perf_counter()
+    for vertex1 in range(vertices):
+        for vertex2 in g.outbound(vertex1):
+            g.get_cost(vertex1, vertex2)
+    print(f"  outbound with costs: {len(pairs) / (perf_counter() - start):.0f} edges/s")
+    del g
+    print(f"  memory: {retained_memory(build) / len(pairs):.1f} bytes/edge")
+
+def bench_river_crossing(items: int = 20):
+    names = list(range(items))
+    for conflicts, capacity in (([], 2), ([], 3)):
+        print(f"RiverCrossing: {items} items, {len(conflicts)} conflicts, capacity {capacity}, {2 ** (items + 1)} states")
+        puzzle, elapsed = timed(lambda: RiverCrossing(names, conflicts, capacity))
+        print(f"  conflict tables: {elapsed:.3f}s")
+        path, elapsed = timed(puzzle.solve)
+        print(f"  solve: {elapsed:.3f}s, {len(path) - 1 if path else None} crossings")
+
+def bench_queries(vertices: int = 20000, edges: int = 30000, queries: int = 500):
+    print(f"batch queries: {vertices} vertices, {edges} lines, {queries} queries")
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "graph.txt")
+        write_edge_list(filename, vertices, edges, (0, 100))
+        g = read_graph_from_file(filename, False)
+    sources = [randint(0, vertices - 1) for _ in range(queries)]
+    _, elapsed = timed(lambda: [accessible(g, source) for source in sources])
+    print(f"  accessible: {queries / elapsed:.0f} queries/s")
+    _, elapsed = timed(lambda: reachability(g, sources))
+    print(f"  reachability: {queries / elapsed:.0f} queries/s")
+    # 10 targets for each of the distinct sources
+    pairs = [(source, randint(0, vertices - 1)) for source in sources[:queries // 10] for _ in range(10)]
+    def walks():
+        for u, v in pairs:
+            try:
+                shortest_walk(g, u, v)
+            except GraphError:
+                pass
+    _, elapsed = timed(walks)
+    print(f"  shortest_walk: {len(pairs) / elapsed:.0f} queries/s")
+    _, elapsed = timed(lambda: batch_shortest_paths(g, pairs))
+    print(f"  batch_shortest_paths: {len(pairs) / elapsed:.0f} queries/s")
+
+def bench_path_cache(vertices: int = 20000, edges: int = 100000, queries: int = 200, sources: int = 10):
+    print(f"shortest path cache: {vertices} vertices, {edges} edges, {queries} queries from {sources} sources")
+    g = random_graph(vertices, edges, seed=1, cost_range=(0, 100))
+    pairs = [(randint(0, sources - 1), randint(0, vertices - 1)) for _ in range(queries)]
+    # a search per query that stops at the target, as shortest_walk did before the cache
+    _, elapsed = timed(lambda: [single_source_shortest_paths(g, u, [v]) for u, v in pairs])
+    print(f"  uncached: {queries / elapsed:.0f} queries/s")
+    def walks():
+        for u, v in pairs:
+            try:
+                shortest_walk(g, u, v)
+            except GraphError:
+                pass
+    _, elapsed = timed(walks)
+    print(f"  cached: {queries / elapsed:.0f} queries/s, {g.shortest_path_cache().stats()}")
+
+def bench_incremental_scc(vertices: int = 20000, edges: int = 40000, updates: int = 200):
+    print(f"IncrementalSCC: {vertices} vertices, {edges} streamed edges")
+    stream = [(randint(0, vertices - 1), randint(0, vertices - 1)) for _ in range(edges)]
+    g = DirectedGraph(vertices)
+    inc = IncrementalSCC(g)
+    def insert():
+        for u, v in stream:
+            inc.add_edge(u, v, 1)
+            inc.same_component(u, v)
+    _, elapsed = timed(insert)
+    print(f"  incremental insert + query: {edges / elapsed:.0f} updates/s, {inc.component_count()} components")
+    # recomputing from scratch after each of the last updates
+    recompute = DirectedGraph(vertices)
+    recompute.add_edges((u, v, 1) for u, v in stream[:-updates])
+    def rerun():
+        for u, v in stream[-updates:]:
+            recompute.add_edge(u, v, 1)
+            strongly_connected_labels(recompute)
+    _, elapsed = timed(rerun)
+    print(f"  recompute after every update: {updates / elapsed:.0f} updates/s")
+    removed = list(g.edges())[::edges // updates]
+    _, elapsed = timed(lambda: [inc.remove_edge(u, v) for u, v, _ in removed])
+    print(f"  incremental delete: {len(removed) / elapsed:.0f} updates/s, {inc.component_count()} components")
+
+def bench_condensation(vertices: int = 50000, edges: int = 200000, queries: int = 20):
+    print(f"condensation: mostly acyclic graph, {vertices} vertices, {edges} edges")
+    g = DirectedGraph(vertices)
+    pairs = ((randint(0, vertices - 1), randint(0, vertices - 1)) for _ in range(edges))
+    g.add_edges((min(u, v), max(u, v), randint(-100, 100)) for u, v in pairs if u != v)
+    # a few small cycles
+    g.add_edges((v, v + 1, 1) for v in range(0, vertices - 1, vertices // 100))
+    g.add_edges((v + 1, v, 1) for v in range(0, vertices - 1, vertices // 100))
+    c, elapsed = timed(lambda: condensation(g))
+    print(f"  build: {elapsed:.3f}s, {c.component_count()} components")
+    sources = [randint(0, vertices // 10) for _ in range(queries)]
+    _, elapsed = timed(lambda: [single_source_shortest_paths(g, source) for source in sources])
+    print(f"  single_source_shortest_paths: {queries / elapsed:.1f} sources/s")
+    _, elapsed = timed(lambda: [c.shortest_paths(source) for source in sources])
+    print(f"  Condensation.shortest_paths: {queries / elapsed:.1f} sources/s")
+    targets = [randint(0, vertices - 1) for _ in sources]
+    _, elapsed = timed(lambda: [target in accessible(g, source) for source, target in zip(sources, targets)])
+    print(f"  accessible: {queries / elapsed:.1f} queries/s")
+    _, elapsed = timed(lambda: [c.reaches(source, target) for source, target in zip(sources, targets)])
+    print(f"  Condensation.reaches: {queries / elapsed:.1f} queries/s")
+
+def bench_parallel(vertices: int = 100000, edges: int = 200000):
+    print(f"parallel components: {vertices} vertices, {edges} edges, {os.cpu_count()} cores")
+    g = random_graph(vertices, edges, seed=1, frozen=True)
+    _, elapsed = timed(lambda: weakly_connected_labels(g))
+    print(f"  weakly_connected_labels: {elapsed:.3f}s")
+    _, elapsed = timed(lambda: strongly_connected_labels(g))
+    print(f"  strongly_connected_labels: {elapsed:.3f}s")
+    for workers in (1, 2, 4, 8):
+        _, weak = timed(lambda: parallel.weakly_connected_labels(g, workers))
+        _, strong = timed(lambda: parallel.strongly_connected_labels(g, workers))
+        print(f"  {workers} workers: weak {weak:.3f}s, strong {strong:.3f}s")
+
+def bench_spanning_forest(vertices: int = 2000):
+    print(f"minimum_spanning_forest: {vertices} vertices, undirected graphs read from files")
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "graph.txt")
+        for density in (0.001, 0.01, 0.05, 0.2):
+            write_edge_list(filename, vertices, int(density * vertices * vertices / 2))
+            g = read_graph_from_file(filename)
+            results = []
+            for algorithm in ("kruskal", "prim"):
+                (forest, total), elapsed = timed(lambda: minimum_spanning_forest(g, algorithm))
+                results.append(f"{algorithm} {elapsed:.3f}s")
+            print(f"  {g.edge_count()} edges: {', '.join(results)}, {len(forest)} tree edges, total {total}")
+
+def bench_schedule(tasks: int = 1000000, dependencies: int = 2):
+    print(f"schedule: {tasks} tasks, each depending on up to {dependencies} earlier ones")
+    g = DirectedGraph(tasks)
+    # durations of 1 to 10, dependencies on the previous 1000 tasks
+    g.add_edges((randint(max(0, task - 1000), task - 1), task, randint(1, 10)) for task in range(1, tasks) for _ in range(dependencies))
+    order, elapsed = timed(lambda: topological_sort(g))
+    print(f"  topological_sort: {elapsed:.3f}s")
+    plan, elapsed = timed(lambda: schedule(g))
+    print(f"  schedule: {elapsed:.3f}s, makespan {plan.makespan}, {len(plan.critical_path())} critical tasks")
+
+def layered_graph(layers: int, width: int, degree: int) -> DirectedGraph:
+    # vertex 0 feeds the first layer, every vertex links to degree random vertices of the next layer,
+    # the last layer drains into vertex 1
+    g = DirectedGraph(2 + layers * width)
+    g.add_edges((0, 2 + column, randint(1, 100)) for column in range(width))
+    g.add_edges((2 + (layers - 1) * width + column, 1, randint(1, 100)) for column in range(width))
+    for layer in range(layers - 1):
+        first = 2 + layer * width
+        g.add_edges((first + column, first + width + randint(0, width - 1), randint(1, 100))
+                    for column in range(width) for _ in range(degree))
+    return g
+
+def sided_grid(rows: int, columns: int) -> DirectedGraph:
+    # grid_graph with an extra source feeding the left column and an extra sink draining the right one
+    g = grid_graph(rows, columns, seed=1, cost_range=(1, 100))
+    source = rows * columns
+    sink = source + 1
+    g.add_vertices((source, sink))
+    g.add_edges((source, row * columns, 1000) for row in range(rows))
+    g.add_edges((row * columns + columns - 1, sink, 1000) for row in range(rows))
+    return g
+
+def bench_max_flow():
+    graphs = [
+        ("layered 20 x 500", layered_graph(20, 500, 5), 0, 1),
+        ("layered 100 x 100", layered_graph(100, 100, 5), 0, 1),
+        ("grid 100 x 100", sided_grid(100, 100), 100 * 100, 100 * 100 + 1),
+        ("grid 30 x 300", sided_grid(30, 300), 30 * 300, 30 * 300 + 1),
+    ]
+    for name, g, source, sink in graphs:
+        print(f"max_flow: {name}, {g.vertice_count()} vertices, {g.edge_count()} edges")
+        for algorithm in ("dinic", "push_relabel"):
+            flow, elapsed = timed(lambda: max_flow(g, source, sink, algorithm))
+            print(f"  {algorithm}: {elapsed:.3f}s, value {flow.value}, {len(flow.cut)} cut edges")
+
+BENCHMARKS = {
+    "freeze": bench_freeze,
+    "remove_vertex": bench_remove_vertex,
+    "all_pairs": bench_all_pairs,
+    "biconnected": bench_biconnected,
+    "read": bench_read,
+    "binary": bench_binary,
+    "write": bench_write,
+    "generators": bench_generators,
+    "copy": bench_copy,
+    "components": bench_components,
+    "core": bench_core,
+    "river_crossing": bench_river_crossing,
+    "queries": bench_queries,
+    "path_cache": bench_path_cache,
+    "incremental_scc": bench_incremental_scc,
+    "condensation": bench_condensation,
+    "parallel": bench_parallel,
+    "spanning_forest": bench_spanning_forest,
+    "schedule": bench_schedule,
+    "max_flow": bench_max_flow,
+}
+
+def main():
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        BENCHMARKS[name]()
+        print()
+
+if __name__ == "__main__":
+    main()
@@ -1,48 +1,92 @@
+import bz2
+import gzip
+import lzma
 import math
-from random import randint
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections import deque
+from functools import partial
+from itertools import chain, compress, islice, repeat
+from operator import add, gt, itemgetter, le, lt, mul
+from heapq import heappop, heappush
+from random import Random
 
 class GraphError(Exception):
     pass
 
+class CycleError(GraphError):
+    # raised when a graph that has to be acyclic isn't, component is a view of a strongly connected
+    # component of it that contains a cycle
+    def __init__(self, component: "SubgraphView"):
+        super().__init__("graph has a cycle")
+        self.component = component
+
 class DirectedGraph:
-    def __init__(self, v = None, d_in = None, d_out = None, costs = None):
-        if d_in is None:
-            self._d_in = {}
-        else:
-            self._d_in = d_in
-        if d_out is None:
-            self._d_out = {}
-        else:
-            self._d_out = d_out
-        if costs is None:
-            self._costs = {}
-        else:
-            self._costs = costs
+    # _d_out[vertex] maps each outbound neighbour to the cost of the edge,
+    # _d_in[vertex] holds the inbound neighbours as the keys of an insertion ordered dict
+    # copies share their dicts copy-on-write: _shared marks the outer dicts as shared and,
+    # once the graph has been copied (_cow), only the per vertex dicts in _owned may be changed in place
+    # _version counts the changes that can alter a shortest path, it tells _path_cache when its trees are stale
+    __slots__ = ("_d_in", "_d_out", "_edges", "_shared", "_cow", "_owned", "_version", "_path_cache")
+
+    def __init__(self, v = None):
+        self._d_in = {}
+        self._d_out = {}
+        self._edges = 0
+        self._shared = False
+        self._cow = False
+        self._owned = set()
+        self._version = 0
+        self._path_cache = None
         if isinstance(v, int):
-            for i in range(v):
-                self.add_vertex(i)
+            self.add_vertices(range(v))
         elif isinstance(v, list):
-            for i in v:
-                self.add_vertex(i)
+            self.add_vertices(v)
+
+    def _unshare(self) -> None:
+        if self._shared:
+            self._d_in = self._d_in.copy()
+            self._d_out = self._d_out.copy()
+            self._shared = False
+
+    def _own(self, vertex: int) -> None:
+        # makes the adjacency dicts of an existing vertex private to this graph before changing them
+        self._unshare()
+        if self._cow and vertex not in self._owned:
+            self._d_in[vertex] = self._d_in[vertex].copy()
+            self._d_out[vertex] = self._d_out[vertex].copy()
+            self._owned.add(vertex)
 
     def add_vertex(self, vertex: int) -> bool:
         if vertex not in self._d_in:
-            self._d_in[vertex] = []
-            self._d_out[vertex] = []
+            self._unshare()
+            self._d_in[vertex] = {}
+            self._d_out[vertex] = {}
+            if self._cow:
+                self._owned.add(vertex)
             return True
         return False
 
     def remove_vertex(self, vertex: int) -> bool:
         if vertex not in self._d_in:
             return False
+        self._own(vertex)
+        # a self loop is in both dicts but is only one edge
+        self._edges -= len(self._d_out[vertex]) + len(self._d_in[vertex]) - (vertex in self._d_in[vertex])
         for out in self._d_out[vertex]:
-            self._costs.pop((vertex, out), None)
-            self._d_in[out].remove(vertex)
+            self._own(out)
+            self._d_in[out].pop(vertex, None)
         for node in self._d_in[vertex]:
-            self._costs.pop((node, vertex), None)
-            self._d_out[node].remove(vertex)
-        self._d_in.pop(vertex, None)
-        self._d_out.pop(vertex, None)
+            self._own(node)
+            self._d_out[node].pop(vertex, None)
+        self._d_in.pop(vertex)
+        self._d_out.pop(vertex)
+        self._owned.discard(vertex)
+        self._version += 1
         return True
 
     def add_edge(self, vertex1: int, vertex2: int, cost: int) -> bool:
@@ -50,30 +94,97 @@ class DirectedGraph:
             raise GraphError("vertex doesn't exist")
         if vertex2 not in self._d_in:
             raise GraphError("vertex doesn't exist")
-        if (vertex1, vertex2) in self._costs:
+        if vertex2 in self._d_out[vertex1]:
             return False
-        self._costs[(vertex1, vertex2)] = cost
-        self._d_out[vertex1].append(vertex2)
-        self._d_in[vertex2].append(vertex1)
+        self._own(vertex1)
+        self._own(vertex2)
+        self._d_out[vertex1][vertex2] = cost
+        self._d_in[vertex2][vertex1] = None
+        self._edges += 1
+        self._version += 1
         return True
 
+    def add_vertices(self, vertices) -> int:
+        # adds every vertex that doesn't exist yet, returns the number of added vertices
+        self._unshare()
+        d_in = self._d_in
+        d_out = self._d_out
+        added = 0
+        for vertex in vertices:
+            if vertex not in d_in:
+                d_in[vertex] = {}
+                d_out[vertex] = {}
+                if self._cow:
+                    self._owned.add(vertex)
+                added += 1
+        return added
+
+    def add_edges(self, edges) -> tuple:
+        # inserts (vertex1, vertex2, cost) rows in one pass, e.g. a list of triples or a numpy array
+        # all endpoints are checked before anything is inserted, so a GraphError leaves the graph unchanged
+        # edges that already exist or repeat within the batch are skipped, the first cost given wins
+        # returns the number of inserted and skipped edges
+        if not isinstance(edges, list):
+            edges = list(edges)
+        if any(length != 3 for length in set(map(len, edges))):
+            raise GraphError("edges must be (vertex1, vertex2, cost) rows")
+        endpoints = set(map(itemgetter(0), edges))
+        endpoints.update(map(itemgetter(1), edges))
+        if not endpoints.issubset(self._d_in.keys()):
+            raise GraphError("vertex doesn't exist")
+        self._unshare()
+        d_in = self._d_in
+        d_out = self._d_out
+        cow = self._cow
+        owned = self._owned
+        inserted = 0
+        for vertex1, vertex2, cost in edges:
+            if vertex2 in d_out[vertex1]:
+                continue
+            if cow:
+                if vertex1 not in owned:
+                    self._own(vertex1)
+                if vertex2 not in owned:
+                    self._own(vertex2)
+            d_out[vertex1][vertex2] = cost
+            d_in[vertex2][vertex1] = None
+            inserted += 1
+        self._edges += inserted
+        if inserted:
+            self._version += 1
+        return inserted, len(edges) - inserted
+
+    def remove_edges(self, edges) -> tuple:
+        # removes (vertex1, vertex2) pairs, further items of a row (e.g. a cost) are ignored
+        # returns the number of removed edges and of the pairs that weren't edges
+        removed = 0
+        skipped = 0
+        for edge in edges:
+            if self.remove_edge(edge[0], edge[1]):
+                removed += 1
+            else:
+                skipped += 1
+        return removed, skipped
+
     def remove_edge(self, vertex1: int, vertex2: int) -> bool:
-        if (vertex1, vertex2) not in self._costs.keys():
+        if not self.is_edge(vertex1, vertex2):
             return False
-        self._costs.pop((vertex1, vertex2))
-        self._d_out[vertex1].remove(vertex2)
-        self._d_in[vertex2].remove(vertex1)
+        self._own(vertex1)
+        self._own(vertex2)
+        del self._d_out[vertex1][vertex2]
+        del self._d_in[vertex2][vertex1]
+        self._edges -= 1
+        self._version += 1
         return True
 
     def vertices(self) -> iter:
         return iter(self._d_in.keys())
 
+    def is_vertex(self, vertex: int) -> bool:
+        return vertex in self._d_in
+
     def is_edge(self, vertex1: int, vertex2: int) -> bool:
-        if vertex1 not in self._d_in.keys() or vertex2 not in self._d_in.keys():
-            return False
-        if vertex2 in self._d_out[vertex1]:
-            return True
-        return False
+        return vertex1 in self._d_out and vertex2 in self._d_out[vertex1]
 
     def in_degree(self, vertex: int) -> int:
         if vertex not in self._d_in:
@@ -89,7 +200,7 @@ class DirectedGraph:
         return len(self._d_in.keys())
 
     def edge_count(self) -> int:
-        return len(self._costs)
+        return self._edges
 
     def outbound(self, vertex: int) -> iter:
         if vertex not in self._d_out:
@@ -101,260 +212,1839 @@ class DirectedGraph:
             raise GraphError("vertex does not exist")
         return iter(self._d_in[vertex])
 
+    def outbound_edges(self, vertex: int) -> iter:
+        # iterates the outbound neighbours of the vertex as (neighbour, cost) pairs
+        if vertex not in self._d_out:
+            raise GraphError("vertex does not exist")
+        return iter(self._d_out[vertex].items())
+
+    def edges(self) -> iter:
+        # iterates all edges as (vertex1, vertex2, cost) triples
+        return ((vertex1, vertex2, cost) for vertex1, out in self._d_out.items() for vertex2, cost in out.items())
+
     def get_cost(self, vertex1: int, vertex2: int) -> int:
-        if (vertex1, vertex2) not in self._costs:
+        try:
+            return self._d_out[vertex1][vertex2]
+        except KeyError:
             raise GraphError("edge does not exist")
-        return self._costs[(vertex1, vertex2)]
 
     def modify_cost(self, vertex1: int, vertex2: int, cost: int) -> None:
-        if (vertex1, vertex2) not in self._costs:
+        if not self.is_edge(vertex1, vertex2):
             raise GraphError("vertex does not exist")
-        self._costs[(vertex1, vertex2)] = cost
+        self._own(vertex1)
+        self._d_out[vertex1][vertex2] = cost
+        self._version += 1
+
+    def shortest_path_cache(self) -> "ShortestPathCache":
+        # the cache of shortest path trees used by shortest_walk, created on first use
+        if self._path_cache is None:
+            self._path_cache = ShortestPathCache()
+        return self._path_cache
+
+    def copy_graph(self) -> "DirectedGraph":
+        # O(1) snapshot, both graphs copy the dicts they change later on
+        copy = DirectedGraph()
+        copy._d_in = self._d_in
+        copy._d_out = self._d_out
+        copy._edges = self._edges
+        copy._shared = self._shared = True
+        copy._cow = self._cow = True
+        self._owned = set()
+        return copy
+
+    def freeze(self) -> "FrozenDirectedGraph":
+        # returns a compact read-only snapshot of the graph
+        ids = list(self._d_in.keys())
+        position = {vertex: i for i, vertex in enumerate(ids)}
+        sources = array("q")
+        targets = array("q")
+        costs = array("q")
+        try:
+            for vertex1, out in self._d_out.items():
+                for vertex2, cost in out.items():
+                    sources.append(position[vertex1])
+                    targets.append(position[vertex2])
+                    costs.append(cost)
+        except OverflowError:
+            raise GraphError("cost or vertex id does not fit in 64 bits")
+        return FrozenDirectedGraph.from_edges(ids, sources, targets, costs)
+
+def _read_only(self, *args):
+    raise GraphError("graph is read-only")
+
+def _row_offsets(rows: array, n: int) -> array:
+    # returns the CSR offsets for an array of row numbers sorted in increasing order
+    return array("q", map(partial(bisect_left, rows), range(n + 1)))
+
+class FrozenDirectedGraph:
+    # read-only graph packed into compressed sparse row (CSR) arrays
+    # vertices are remapped to positions 0..n-1, _ids[i] is the original id of position i
+    # the outbound neighbours of position i are _out_targets[_out_offsets[i]:_out_offsets[i + 1]]
+    # with the matching costs in _out_costs, rows are sorted so edges are found by binary search
+    # the inbound neighbours are stored the same way in _in_offsets / _in_sources
+    __slots__ = ("_ids", "_index", "_out_offsets", "_out_targets", "_out_costs", "_in_offsets", "_in_sources")
+
+    def __init__(self, ids, out_offsets, out_targets, out_costs, in_offsets, in_sources):
+        self._out_offsets = out_offsets
+        self._out_targets = out_targets
+        self._out_costs = out_costs
+        self._in_offsets = in_offsets
+        self._in_sources = in_sources
+        if ids == range(len(ids)) or all(vertex == i for i, vertex in enumerate(ids)):
+            # vertices are exactly 0..n-1, so no remapping is needed
+            self._ids = range(len(ids))
+            self._index = None
+        else:
+            self._ids = ids
+            self._index = {vertex: i for i, vertex in enumerate(ids)}
+
+    @staticmethod
+    def from_edges(ids, sources: array, targets: array, costs: array) -> "FrozenDirectedGraph":
+        # builds the CSR arrays from parallel edge arrays given as vertex positions
+        # edges must be unique, ids[i] is the original id of position i
+        n = len(ids)
+        edges = range(len(sources))
+        out_keys = list(map(add, map(mul, sources, repeat(n)), targets))
+        in_keys = list(map(add, map(mul, targets, repeat(n)), sources))
+        by_source = sorted(edges, key=out_keys.__getitem__)
+        by_target = sorted(edges, key=in_keys.__getitem__)
+        out_targets = array("q", map(targets.__getitem__, by_source))
+        out_costs = array("q", map(costs.__getitem__, by_source))
+        in_sources = array("q", map(sources.__getitem__, by_target))
+        out_offsets = _row_offsets(array("q", map(sources.__getitem__, by_source)), n)
+        in_offsets = _row_offsets(array("q", map(targets.__getitem__, by_target)), n)
+        if not isinstance(ids, range):
+            try:
+                ids = array("q", ids)
+            except OverflowError:
+                raise GraphError("cost or vertex id does not fit in 64 bits")
+        return FrozenDirectedGraph(ids, out_offsets, out_targets, out_costs, in_offsets, in_sources)
+
+    def _position(self, vertex: int) -> int:
+        if self._index is None:
+            if isinstance(vertex, int) and 0 <= vertex < len(self._ids):
+                return vertex
+        elif vertex in self._index:
+            return self._index[vertex]
+        raise GraphError("vertex does not exist")
+
+    def _edge_position(self, vertex1: int, vertex2: int) -> int:
+        # returns the index of the edge in _out_targets or -1 if it doesn't exist
+        try:
+            i = self._position(vertex1)
+            j = self._position(vertex2)
+        except GraphError:
+            return -1
+        hi = self._out_offsets[i + 1]
+        k = bisect_left(self._out_targets, j, self._out_offsets[i], hi)
+        if k < hi and self._out_targets[k] == j:
+            return k
+        return -1
+
+    def _to_ids(self, positions: array) -> iter:
+        if self._index is None:
+            return iter(positions)
+        return map(self._ids.__getitem__, positions)
+
+    def vertices(self) -> iter:
+        return iter(self._ids)
+
+    def is_vertex(self, vertex: int) -> bool:
+        try:
+            self._position(vertex)
+        except GraphError:
+            return False
+        return True
+
+    def is_edge(self, vertex1: int, vertex2: int) -> bool:
+        return self._edge_position(vertex1, vertex2) != -1
+
+    def in_degree(self, vertex: int) -> int:
+        i = self._position(vertex)
+        return self._in_offsets[i + 1] - self._in_offsets[i]
+
+    def out_degree(self, vertex: int) -> int:
+        i = self._position(vertex)
+        return self._out_offsets[i + 1] - self._out_offsets[i]
+
+    def vertice_count(self) -> int:
+        return len(self._ids)
+
+    def edge_count(self) -> int:
+        return len(self._out_targets)
+
+    def outbound(self, vertex: int) -> iter:
+        i = self._position(vertex)
+        return self._to_ids(self._out_targets[self._out_offsets[i]:self._out_offsets[i + 1]])
+
+    def inbound(self, vertex: int) -> iter:
+        i = self._position(vertex)
+        return self._to_ids(self._in_sources[self._in_offsets[i]:self._in_offsets[i + 1]])
+
+    def outbound_edges(self, vertex: int) -> iter:
+        # iterates the outbound neighbours of the vertex as (neighbour, cost) pairs
+        i = self._position(vertex)
+        lo = self._out_offsets[i]
+        hi = self._out_offsets[i + 1]
+        return zip(self._to_ids(self._out_targets[lo:hi]), self._out_costs[lo:hi])
+
+    def edges(self) -> iter:
+        # iterates all edges as (vertex1, vertex2, cost) triples
+        for i, vertex1 in enumerate(self._ids):
+            for vertex2, cost in self.outbound_edges(vertex1):
+                yield vertex1, vertex2, cost
+
+    def get_cost(self, vertex1: int, vertex2: int) -> int:
+        k = self._edge_position(vertex1, vertex2)
+        if k == -1:
+            raise GraphError("edge does not exist")
+        return self._out_costs[k]
+
+    # the mutating methods of DirectedGraph are rejected
+    add_vertex = remove_vertex = add_edge = remove_edge = modify_cost = _read_only
+    add_vertices = add_edges = remove_edges = _read_only
 
     def copy_graph(self) -> "DirectedGraph":
-        in_copy = self._d_in.copy()
-        out_copy = self._d_out.copy()
-        costs_copy = self._costs.copy()
-        return DirectedGraph(None, in_copy, out_copy, costs_copy)
+        return self.thaw()
 
-def read_graph_from_file(filename: str) -> "DirectedGraph":
+    def freeze(self) -> "FrozenDirectedGraph":
+        return self
+
+    def thaw(self) -> "DirectedGraph":
+        # returns a mutable copy of the graph
+        g = DirectedGraph(list(self._ids))
+        g.add_edges(self.edges())
+        return g
+
+class SubgraphView:
+    # read-only view of the subgraph of parent induced by a set of vertices, nothing is copied
+    # vertices and edges are filtered lazily on every call, so the view follows later changes of the parent,
+    # vertices removed from the parent drop out of the view and ones added to it don't join it
+    # materialize() returns an independent mutable copy
+    __slots__ = ("_parent", "_vertices")
+
+    def __init__(self, parent: "DirectedGraph", vertices):
+        self._parent = parent
+        # insertion ordered dict used as an ordered set
+        self._vertices = dict.fromkeys(vertices)
+
+    def _check(self, vertex: int) -> None:
+        if not self.is_vertex(vertex):
+            raise GraphError("vertex does not exist")
+
+    def vertices(self) -> iter:
+        return filter(self._parent.is_vertex, self._vertices)
+
+    def is_vertex(self, vertex: int) -> bool:
+        return vertex in self._vertices and self._parent.is_vertex(vertex)
+
+    def is_edge(self, vertex1: int, vertex2: int) -> bool:
+        # an edge of the parent has both of its endpoints in the parent
+        return vertex1 in self._vertices and vertex2 in self._vertices and self._parent.is_edge(vertex1, vertex2)
+
+    def in_degree(self, vertex: int) -> int:
+        return sum(1 for _ in self.inbound(vertex))
+
+    def out_degree(self, vertex: int) -> int:
+        return sum(1 for _ in self.outbound(vertex))
+
+    def vertice_count(self) -> int:
+        return sum(1 for _ in self.vertices())
+
+    def edge_count(self) -> int:
+        return sum(self.out_degree(vertex) for vertex in self.vertices())
+
+    def outbound(self, vertex: int) -> iter:
+        self._check(vertex)
+        return (out for out in self._parent.outbound(vertex) if out in self._vertices)
+
+    def inbound(self, vertex: int) -> iter:
+        self._check(vertex)
+        return (node for node in self._parent.inbound(vertex) if node in self._vertices)
+
+    def outbound_edges(self, vertex: int) -> iter:
+        # iterates the outbound neighbours of the vertex as (neighbour, cost) pairs
+        self._check(vertex)
+        return ((out, cost) for out, cost in self._parent.outbound_edges(vertex) if out in self._vertices)
+
+    def edges(self) -> iter:
+        # iterates all edges as (vertex1, vertex2, cost) triples
+        for vertex1 in self.vertices():
+            for vertex2, cost in self.outbound_edges(vertex1):
+                yield vertex1, vertex2, cost
+
+    def get_cost(self, vertex1: int, vertex2: int) -> int:
+        if not self.is_edge(vertex1, vertex2):
+            raise GraphError("edge does not exist")
+        return self._parent.get_cost(vertex1, vertex2)
+
+    # the mutating methods of DirectedGraph are rejected
+    add_vertex = remove_vertex = add_edge = remove_edge = modify_cost = _read_only
+    add_vertices = add_edges = remove_edges = _read_only
+
+    def materialize(self) -> "DirectedGraph":
+        g = DirectedGraph(list(self.vertices()))
+        g.add_edges(self.edges())
+        return g
+
+    def copy_graph(self) -> "DirectedGraph":
+        return self.materialize()
+
+    def freeze(self) -> "FrozenDirectedGraph":
+        return self.materialize().freeze()
+
+# compressed graph files are recognised by their extension
+_COMPRESSION_EXTENSIONS = {".gz": "gzip", ".bz2": "bz2", ".xz": "lzma"}
+_COMPRESSION_MODULES = {"gzip": gzip, "bz2": bz2, "lzma": lzma}
+
+def _compression_module(filename: str, compression):
+    # returns the module used to (de)compress the file or None for plain files
+    if compression is None:
+        compression = _COMPRESSION_EXTENSIONS.get(os.path.splitext(filename)[1])
+        if compression is None:
+            return None
+    if compression not in _COMPRESSION_MODULES:
+        raise GraphError(f"unknown compression {compression}")
+    return _COMPRESSION_MODULES[compression]
+
+def _both_directions(sources: list, targets: list, costs: list) -> iter:
+    for vertex1, vertex2, cost in zip(sources, targets, costs):
+        yield vertex1, vertex2, cost
+        yield vertex2, vertex1, cost
+
+def read_graph_from_file(filename: str, undirected: bool = True, chunk_size: int = 1 << 20, progress = None,
+                         compression = None) -> "DirectedGraph":
+    # reads a graph in the "V E" or "nodelist" format, followed by one "vertex1 vertex2 cost" line per edge
+    # with undirected every line adds the edge in both directions
+    # edge lines are parsed in chunks of about chunk_size bytes,
+    # progress(bytes_read, total_bytes) is called after each chunk when given (counting compressed bytes)
+    # compression is None, "gzip", "bz2" or "lzma", by default it follows the .gz / .bz2 / .xz extension
+    module = _compression_module(filename, compression)
     try:
-        f = open(filename, "r")
+        raw = open(filename, "rb")
     except FileNotFoundError:
         raise GraphError(f"file {filename} not found")
-    with open(filename, "r") as f:
-        lines = f.readlines()
-        line1 = lines.pop(0)
-        line1 = line1.strip()
-        if line1 == "nodelist":
-            line1 = lines.pop(0)
-            line1.strip()
-            tokens = line1.split()
-            nodes = []
-            for node in tokens:
-                nodes.append(int(node))
-            g = DirectedGraph(nodes)
-        else:
-            tokens = line1.split()
-            vertices = int(tokens[0])
-            g = DirectedGraph(vertices)
-        for line in lines:
-            line = line.strip()
-            if line == "":
-                continue
-            tokens = line.split()
-            vertex1 = int(tokens[0])
-            vertex2 = int(tokens[1])
-            cost = int(tokens[2])
-            g.add_edge(vertex1, vertex2, cost)
-            g.add_edge(vertex2, vertex1, cost)
+    with raw, (module.open(raw, "rb") if module is not None else raw) as f:
+        total = os.fstat(raw.fileno()).st_size
+        try:
+            line1 = f.readline().strip()
+            if line1 == b"nodelist":
+                g = DirectedGraph([int(node) for node in f.readline().split()])
+            else:
+                g = DirectedGraph(int(line1.split()[0]))
+            while True:
+                lines = f.readlines(chunk_size)
+                if not lines:
+                    break
+                rows = list(map(bytes.split, lines))
+                # every edge line needs exactly 3 values, blank lines are skipped
+                if not set(map(len, rows)) <= {0, 3}:
+                    raise GraphError(f"file {filename} has an edge line without exactly 3 values")
+                values = list(map(int, chain.from_iterable(rows)))
+                sources = values[0::3]
+                targets = values[1::3]
+                costs = values[2::3]
+                if undirected:
+                    g.add_edges(_both_directions(sources, targets, costs))
+                else:
+                    g.add_edges(zip(sources, targets, costs))
+                if progress is not None:
+                    progress(raw.tell(), total)
+        except (ValueError, IndexError, OSError, EOFError, lzma.LZMAError):
+            raise GraphError(f"file {filename} is not a valid graph file")
         return g
 
-def write_graph_to_file(filename: str, g: "DirectedGraph") -> None:
-    with open(filename, "w") as f:
-        ok = True
-        for x in g.vertices():
-            if x >= g.vertice_count():
-                ok = False
-                break
-        if ok:
-            print(f"{g.vertice_count()} {g.edge_count()}", file = f)
+def write_graph_to_file(filename: str, g: "DirectedGraph", compression = None, chunk_size: int = 1 << 16) -> None:
+    # writes the "V E" header when the vertices are 0..n-1 and the "nodelist" header otherwise
+    # edges are formatted and written chunk_size lines at a time
+    # compression is None, "gzip", "bz2" or "lzma", by default it follows the .gz / .bz2 / .xz extension
+    module = _compression_module(filename, compression)
+    if module is None:
+        f = open(filename, "w", buffering=1 << 20)
+    else:
+        f = module.open(filename, "wt")
+    with f:
+        nodes = list(g.vertices())
+        n = len(nodes)
+        # vertex ids are distinct, so they are exactly 0..n-1 when they all fall in that range
+        if min(nodes, default=0) >= 0 and max(nodes, default=-1) < n:
+            f.write(f"{n} {g.edge_count()}\n")
         else:
-            print("nodelist", file = f)
-            nodes = ""
-            for x in g.vertices():
-                nodes = nodes + f"{x} "
-            print(nodes, file = f)
-        for vertex1 in g.vertices():
-            for vertex2 in g.outbound(vertex1):
-                print(f"{vertex1} {vertex2} {g.get_cost(vertex1, vertex2)}", file = f)
-
-def random_graph(vertices: int, edges: int) -> "DirectedGraph":
+            f.write("nodelist\n")
+            f.write(" ".join(map(str, nodes)) + "\n")
+        edges = g.edges()
+        while True:
+            lines = [f"{vertex1} {vertex2} {cost}\n" for vertex1, vertex2, cost in islice(edges, chunk_size)]
+            if not lines:
+                break
+            f.writelines(lines)
+
+# binary graph files hold a header followed by the CSR arrays of a FrozenDirectedGraph as int64 values:
+# ids (left out when the vertices are 0..n-1), out_offsets, out_targets, out_costs, in_offsets, in_sources
+BINARY_MAGIC = b"DGRB"
+BINARY_VERSION = 1
+BINARY_EXTENSION = ".bin"
+# magic, version, flags, n, m padded to 32 bytes so the arrays stay 8 byte aligned
+_BINARY_HEADER = struct.Struct("<4sIIxxxxqq")
+_IDENTITY_IDS = 1
+
+def is_binary_graph_file(filename: str) -> bool:
+    try:
+        with open(filename, "rb") as f:
+            return f.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+    except FileNotFoundError:
+        raise GraphError(f"file {filename} not found")
+
+def save_binary(filename: str, g: "DirectedGraph") -> None:
+    if sys.byteorder != "little":
+        raise GraphError("binary graph files are only supported on little endian machines")
+    frozen = g.freeze()
+    identity = frozen._index is None
+    header = _BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, _IDENTITY_IDS if identity else 0,
+                                 frozen.vertice_count(), frozen.edge_count())
+    # written to a temporary file that then replaces filename, graphs load_binary mapped from
+    # the old file keep its data instead of seeing it truncated
+    temporary = f"{filename}.{os.getpid()}.tmp"
+    f = open(temporary, "xb")
+    try:
+        with f:
+            f.write(header)
+            if not identity:
+                f.write(memoryview(frozen._ids).cast("B"))
+            for values in (frozen._out_offsets, frozen._out_targets, frozen._out_costs,
+                           frozen._in_offsets, frozen._in_sources):
+                f.write(memoryview(values).cast("B"))
+        os.replace(temporary, filename)
+    except BaseException:
+        os.remove(temporary)
+        raise
+
+def load_binary(filename: str) -> "FrozenDirectedGraph":
+    # maps the file into memory instead of reading it, pages are loaded lazily as the graph is used
+    # only the offsets are scanned to check them, and the ids when the vertices are not 0..n-1
+    # (to build the id remap)
+    if sys.byteorder != "little":
+        raise GraphError("binary graph files are only supported on little endian machines")
+    try:
+        f = open(filename, "rb")
+    except FileNotFoundError:
+        raise GraphError(f"file {filename} not found")
+    with f:
+        try:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise GraphError(f"file {filename} is not a binary graph file")
+    if len(buffer) < _BINARY_HEADER.size:
+        raise GraphError(f"file {filename} is not a binary graph file")
+    magic, version, flags, n, m = _BINARY_HEADER.unpack_from(buffer)
+    if magic != BINARY_MAGIC:
+        raise GraphError(f"file {filename} is not a binary graph file")
+    if version != BINARY_VERSION:
+        raise GraphError(f"file {filename} has unsupported version {version}")
+    identity = flags & _IDENTITY_IDS
+    lengths = ([] if identity else [n]) + [n + 1, m, m, n + 1, m]
+    if len(buffer) != _BINARY_HEADER.size + 8 * sum(lengths):
+        raise GraphError(f"file {filename} is truncated")
+    view = memoryview(buffer)
+    arrays = []
+    position = _BINARY_HEADER.size
+    for length in lengths:
+        arrays.append(view[position:position + 8 * length].cast("q"))
+        position += 8 * length
+    if identity:
+        arrays.insert(0, range(n))
+    for offsets in (arrays[1], arrays[4]):
+        if offsets[0] != 0 or offsets[-1] != m or not all(map(le, offsets[:-1], offsets[1:])):
+            raise GraphError(f"file {filename} has invalid edge offsets")
+    return FrozenDirectedGraph(*arrays)
+
+def _generated_graph(vertices: int, sources: list, targets: list, costs: list, frozen: bool):
+    # builds the graph on vertices 0..vertices-1 from parallel lists of unique edges
+    if frozen:
+        return FrozenDirectedGraph.from_edges(range(vertices), array("q", sources), array("q", targets), array("q", costs))
+    g = DirectedGraph(vertices)
+    g.add_edges(zip(sources, targets, costs))
+    return g
+
+def _random_costs(rng: Random, count: int, cost_range: tuple) -> list:
+    return rng.choices(range(cost_range[0], cost_range[1] + 1), k=count)
+
+def random_graph(vertices: int, edges: int, seed = None, frozen: bool = False, cost_range: tuple = (-100, 100)):
+    # picks edges distinct (vertex1, vertex2) pairs uniformly, self loops included
+    # the pairs are sampled without replacement as linear indices vertex1 * vertices + vertex2,
+    # so near complete graphs don't retry duplicates
+    # the same seed always gives the same graph, with frozen a FrozenDirectedGraph is built directly
     if edges > vertices ** 2:
         raise GraphError(f"can't create graph with {vertices} vertices and {edges} edges")
-    g = DirectedGraph()
-    for i in range(vertices):
-        g.add_vertex(i)
-    count = 0
-    while count < edges:
-        vertex1 = randint(0, g.vertice_count() - 1)
-        vertex2 = randint(0, g.vertice_count() - 1)
-        cost = randint(-100, 100)
-        rez = g.add_edge(vertex1, vertex2, cost)
-        count += rez
-    return g
+    rng = Random(seed)
+    picks = rng.sample(range(vertices * vertices), edges)
+    sources = [pick // vertices for pick in picks]
+    targets = [pick % vertices for pick in picks]
+    return _generated_graph(vertices, sources, targets, _random_costs(rng, edges, cost_range), frozen)
+
+def erdos_renyi_graph(vertices: int, p: float, seed = None, frozen: bool = False, cost_range: tuple = (-100, 100)):
+    # G(n, p): every ordered pair of distinct vertices is an edge with probability p
+    # the gaps between chosen pairs are drawn from the geometric distribution, so it costs O(V + E)
+    if p < 0 or p > 1:
+        raise GraphError("p must be between 0 and 1")
+    rng = Random(seed)
+    pairs = vertices * (vertices - 1)
+    sources = []
+    targets = []
+    # log1p keeps small p from rounding 1 - p to 1, if even that underflows there are no edges
+    log_q = math.log1p(-p) if p < 1 else None
+    if p > 0 and log_q != 0:
+        pair = -1
+        while True:
+            if log_q is None:
+                pair += 1
+            else:
+                # the gap is a float that can be huge (or inf) for tiny p, compare it before converting
+                gap = math.log(1 - rng.random()) / log_q
+                if gap >= pairs - pair:
+                    break
+                pair += 1 + int(gap)
+            if pair >= pairs:
+                break
+            # pair indexes the vertices - 1 targets of each source that aren't the source itself
+            vertex1, vertex2 = divmod(pair, vertices - 1)
+            sources.append(vertex1)
+            targets.append(vertex2 + (vertex2 >= vertex1))
+    return _generated_graph(vertices, sources, targets, _random_costs(rng, len(sources), cost_range), frozen)
 
-def accessible(g: "DirectedGraph", node: int) -> set:
+def scale_free_graph(vertices: int, m: int, seed = None, frozen: bool = False, cost_range: tuple = (-100, 100)):
+    # Barabasi-Albert preferential attachment, every new vertex gets edges to m distinct older vertices
+    # chosen with probability proportional to their degree
+    if m < 1 or m >= vertices:
+        raise GraphError(f"can't attach {m} edges per vertex in a graph with {vertices} vertices")
+    rng = Random(seed)
+    sources = []
+    targets = []
+    # every vertex appears in endpoints once per incident edge, so a uniform pick is degree proportional
+    endpoints = []
+    chosen = list(range(m))
+    for vertex in range(m, vertices):
+        for target in chosen:
+            sources.append(vertex)
+            targets.append(target)
+        endpoints.extend(chosen)
+        endpoints.extend([vertex] * m)
+        picked = set()
+        while len(picked) < m:
+            picked.add(rng.choice(endpoints))
+        chosen = list(picked)
+    return _generated_graph(vertices, sources, targets, _random_costs(rng, len(sources), cost_range), frozen)
+
+def grid_graph(rows: int, columns: int, seed = None, frozen: bool = False, cost_range: tuple = (-100, 100)):
+    # vertex row * columns + column is joined both ways to its right and lower neighbours,
+    # both directions of a link share the same random cost
+    rng = Random(seed)
+    sources = []
+    targets = []
+    for row in range(rows):
+        for column in range(columns):
+            vertex = row * columns + column
+            if column + 1 < columns:
+                sources.append(vertex)
+                targets.append(vertex + 1)
+            if row + 1 < rows:
+                sources.append(vertex)
+                targets.append(vertex + columns)
+    costs = _random_costs(rng, len(sources), cost_range)
+    return _generated_graph(rows * columns, sources + targets, targets + sources, costs + costs, frozen)
+
+def print_trace(node: int, stack: list, acc: set) -> None:
+    # tracing hook for accessible that prints every step of the search
+    print(f"node: {node}")
+    print("stack:", stack)
+    print("acc:", acc)
+
+def accessible(g: "DirectedGraph", node: int, trace = None) -> set:
     # returns the set of nodes accessible from the given node
-    if node not in g.vertices():
+    # trace(node, stack, acc) is called after every step of the search when given, e.g. print_trace
+    if not g.is_vertex(node):
         raise GraphError("node does not exist")
     # acc is the set containing the accessible nodes
-    print(f"accessible({node})")
-    acc = set()
-    acc.add(node)
+    acc = {node}
     stack = [node]
-    print("stack:", stack)
-    print("acc:", acc)
-    # we use a stack to simulate DFS
+    # we use a stack to simulate DFS, neighbours[i] holds the unexplored neighbours of stack[i]
+    neighbours = [g.outbound(node)]
     while len(stack) > 0:
-        node = stack[len(stack)-1]
+        node = stack[-1]
         found = False
-        # iterate through neighbours of the node
-        print(f"node: {node}")
-        print("stack:", stack)
-        for out in g.outbound(node):
-            print(f"out: {out}")
+        for out in neighbours[-1]:
             if out not in acc:
                 # if we have not already visited this node, add it to the set and stack
                 acc.add(out)
                 stack.append(out)
+                neighbours.append(g.outbound(out))
                 found = True
                 break
         if not found:
             # if we have visited all neighbours, remove the node from the stack
             stack.pop()
-        print("stack:", stack)
-        print("acc:", acc)
-    print()
+            neighbours.pop()
+        if trace is not None:
+            trace(node, stack, acc)
     return acc
 
+def reachability(g: "DirectedGraph", sources) -> list:
+    # answers accessible() for many sources in one search
+    # returns one bytearray per source, aligned with the order of g.vertices(), row[i] is 1 if the i-th vertex is accessible
+    # every vertex carries a bitset of the sources reaching it and only the newly gained bits are propagated,
+    # so the sources share the traversal of the parts of the graph they have in common
+    order = list(g.vertices())
+    index = {vertex: i for i, vertex in enumerate(order)}
+    sources = list(sources)
+    for source in sources:
+        if source not in index:
+            raise GraphError("node does not exist")
+    bit = {}
+    for source in sources:
+        bit.setdefault(source, 1 << len(bit))
+    adj = [[index[out] for out in g.outbound(vertex)] for vertex in order]
+    reach = [0] * len(order)
+    pending = {}
+    for source, mask in bit.items():
+        reach[index[source]] = mask
+        pending[index[source]] = mask
+    queue = deque(pending)
+    while queue:
+        node = queue.popleft()
+        new = pending.pop(node)
+        for out in adj[node]:
+            gained = new & ~reach[out]
+            if gained:
+                reach[out] |= gained
+                if out in pending:
+                    pending[out] |= gained
+                else:
+                    pending[out] = gained
+                    queue.append(out)
+    rows = {}
+    result = []
+    for source in sources:
+        if source in rows:
+            result.append(bytearray(rows[source]))
+        else:
+            rows[source] = bytearray(map(bool, map(bit[source].__and__, reach)))
+            result.append(rows[source])
+    return result
+
+def _find(parent: array, x: int) -> int:
+    root = x
+    while parent[root] != root:
+        root = parent[root]
+    # path compression
+    while parent[x] != root:
+        parent[x], x = root, parent[x]
+    return root
+
+def _union(parent: array, rank: bytearray, x: int, y: int) -> bool:
+    # union by rank, returns False if x and y were already in the same set
+    x = _find(parent, x)
+    y = _find(parent, y)
+    if x == y:
+        return False
+    if rank[x] < rank[y]:
+        x, y = y, x
+    parent[y] = x
+    if rank[x] == rank[y]:
+        rank[x] += 1
+    return True
+
+def weakly_connected_labels(g: "DirectedGraph") -> array:
+    # disjoint set union over the edges, ignoring their direction
+    # returns the component label of every vertex in g.vertices() order,
+    # labels are numbered in the order their first vertex appears
+    order = list(g.vertices())
+    index = {vertex: i for i, vertex in enumerate(order)}
+    n = len(order)
+    parent = array("q", range(n))
+    rank = bytearray(n)
+    for vertex1, vertex2, _ in g.edges():
+        _union(parent, rank, index[vertex1], index[vertex2])
+    labels = array("q", [-1]) * n
+    label_of_root = {}
+    for i in range(n):
+        root = _find(parent, i)
+        if root not in label_of_root:
+            label_of_root[root] = len(label_of_root)
+        labels[i] = label_of_root[root]
+    return labels
+
 def connected_components(g: "DirectedGraph") -> list:
-    # returns the connected components of the graph generated as graph objects
-    visited = set()
-    components = []
-    # iterate through all nodes
-    for node in g.vertices():
-        # if we found a node that has not been visited, we have found a new component
-        if node not in visited:
-            acc = accessible(g, node)
-            # get the nodes in the component and create the new graph object
-            comp = DirectedGraph()
-            for vertex in acc:
-                comp.add_vertex(vertex)
-                for vertex2 in g.outbound(vertex):
-                    if vertex2 in acc:
-                        comp.add_vertex(vertex2)
-                        comp.add_edge(vertex, vertex2, g.get_cost(vertex, vertex2))
-            components.append(comp)
-            visited.update(acc)
-            print("acc:", acc)
-            print("visited:", visited)
-            print()
-    return components
+    # returns the connected components of the graph as views of it
+    return list(component_subgraphs(g, weakly_connected_labels(g)))
 
-def strongly_connected_components(g: "DirectedGraph") -> list:
-    # Tarjan's Algorithm for finding SCCs
-    index = 0
-    stack = []
-    indices = {}
-    lowlink = {}
-    on_stack = set()
-    components = []
+def component_subgraphs(g: "DirectedGraph", labels: array) -> iter:
+    # lazily yields one SubgraphView per component, labels[i] is the component of the i-th vertex of g.vertices()
+    members = [[] for _ in range(max(labels, default=-1) + 1)]
+    for vertex, label in zip(g.vertices(), labels):
+        members[label].append(vertex)
+    for vertices in members:
+        yield SubgraphView(g, vertices)
 
-    def strongconnect(v):
-        nonlocal index
-        indices[v] = index
-        lowlink[v] = index
-        index += 1
-        stack.append(v)
-        on_stack.add(v)
-
-        for w in g.outbound(v):
-            if w not in indices:
-                strongconnect(w)
-                lowlink[v] = min(lowlink[v], lowlink[w])
-            elif w in on_stack:
-                lowlink[v] = min(lowlink[v], indices[w])
-
-        if lowlink[v] == indices[v]:
-            component = DirectedGraph()
-            while True:
-                w = stack.pop()
-                on_stack.remove(w)
-                component.add_vertex(w)
-                for x in g.outbound(w):
-                    if x in component.vertices():
-                        component.add_edge(w, x, g.get_cost(w, x))
-                if w == v:
+def strongly_connected_labels(g: "DirectedGraph") -> array:
+    # Tarjan's Algorithm with an explicit call stack instead of recursion
+    # returns the SCC label of every vertex in g.vertices() order
+    # labels are given in the order the SCCs are completed, which is a reverse topological order
+    order = list(g.vertices())
+    index = {vertex: i for i, vertex in enumerate(order)}
+    n = len(order)
+    indices = array("q", [-1]) * n
+    lowlink = array("q", [0]) * n
+    labels = array("q", [-1]) * n
+    on_stack = bytearray(n)
+    stack = []
+    counter = 0
+    label = 0
+    for root in range(n):
+        if indices[root] != -1:
+            continue
+        indices[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = 1
+        # each frame holds a vertex and the iterator over its remaining outbound neighbours
+        calls = [(root, g.outbound(order[root]))]
+        while calls:
+            v, neighbours = calls[-1]
+            for out in neighbours:
+                w = index[out]
+                if indices[w] == -1:
+                    indices[w] = lowlink[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack[w] = 1
+                    calls.append((w, g.outbound(out)))
                     break
-            components.append(component)
+                if on_stack[w] and indices[w] < lowlink[v]:
+                    lowlink[v] = indices[w]
+            else:
+                # all neighbours of v are done, return to the caller
+                calls.pop()
+                if calls:
+                    u = calls[-1][0]
+                    if lowlink[v] < lowlink[u]:
+                        lowlink[u] = lowlink[v]
+                if lowlink[v] == indices[v]:
+                    while True:
+                        w = stack.pop()
+                        on_stack[w] = 0
+                        labels[w] = label
+                        if w == v:
+                            break
+                    label += 1
+    return labels
 
-    for v in g.vertices():
-        if v not in indices:
-            strongconnect(v)
+def strongly_connected_components(g: "DirectedGraph") -> list:
+    # returns the strongly connected components of the graph as views of it
+    return list(component_subgraphs(g, strongly_connected_labels(g)))
 
-    return components
+def condensation(g: "DirectedGraph") -> "Condensation":
+    # returns the DAG of the strongly connected components of the graph
+    return Condensation(g)
+
+class Condensation:
+    # the DAG of the strongly connected components of a graph, built in one O(V + E) pass
+    # components are numbered in topological order, every edge of the DAG goes from a lower to a higher id
+    # members[c] lists the vertices of component c, min_cost[c] and max_cost[c] map every component
+    # reached by an edge leaving c to the lowest and highest cost of those edges
+    # walks in the DAG ignore the costs inside the components, on an acyclic graph they are the walks of the graph
+    __slots__ = ("graph", "members", "min_cost", "max_cost", "_component")
+
+    def __init__(self, g: "DirectedGraph"):
+        self.graph = g
+        labels = strongly_connected_labels(g)
+        count = max(labels, default=-1) + 1
+        self.members = [[] for _ in range(count)]
+        self._component = {}
+        # Tarjan completes the components in reverse topological order
+        for vertex, label in zip(g.vertices(), labels):
+            component = count - 1 - label
+            self._component[vertex] = component
+            self.members[component].append(vertex)
+        self.min_cost = [{} for _ in range(count)]
+        self.max_cost = [{} for _ in range(count)]
+        component = self._component
+        for vertex1, vertex2, cost in g.edges():
+            a = component[vertex1]
+            b = component[vertex2]
+            if a != b:
+                low = self.min_cost[a]
+                if b not in low:
+                    low[b] = cost
+                    self.max_cost[a][b] = cost
+                elif cost < low[b]:
+                    low[b] = cost
+                elif cost > self.max_cost[a][b]:
+                    self.max_cost[a][b] = cost
+
+    def component(self, vertex: int) -> int:
+        if vertex not in self._component:
+            raise GraphError("vertex does not exist")
+        return self._component[vertex]
+
+    def component_count(self) -> int:
+        return len(self.members)
+
+    def is_acyclic(self) -> bool:
+        # True if the graph itself is a DAG, i.e. has no cycles and no self loops
+        return len(self.members) == self.graph.vertice_count() and not any(
+            self.graph.is_edge(vertex, vertex) for vertex in self._component)
+
+    def topological_order(self) -> list:
+        # returns the vertices of the graph so that the components come in topological order
+        return [vertex for members in self.members for vertex in members]
+
+    def edges(self) -> iter:
+        # iterates the edges of the DAG as (component1, component2, min cost) triples
+        return ((a, b, cost) for a, out in enumerate(self.min_cost) for b, cost in out.items())
+
+    def freeze(self) -> "FrozenDirectedGraph":
+        # returns the DAG as a graph over the component ids with the min costs
+        sources = array("q")
+        targets = array("q")
+        costs = array("q")
+        for a, b, cost in self.edges():
+            sources.append(a)
+            targets.append(b)
+            costs.append(cost)
+        return FrozenDirectedGraph.from_edges(range(len(self.members)), sources, targets, costs)
+
+    def reaches(self, vertex1: int, vertex2: int) -> bool:
+        # True if vertex2 is accessible from vertex1, only components numbered in between are searched
+        a = self.component(vertex1)
+        b = self.component(vertex2)
+        if a == b:
+            return True
+        seen = {a}
+        stack = [a]
+        while stack:
+            for c in self.min_cost[stack.pop()]:
+                if c == b:
+                    return True
+                if c < b and c not in seen:
+                    seen.add(c)
+                    stack.append(c)
+        return False
+
+    def _relax(self, vertex: int, costs: list, start: float, better) -> array:
+        # dynamic programming over the components in topological order from the component of vertex
+        # the heap hands out the reached components by increasing id, so the others are never visited
+        source = self.component(vertex)
+        dist = array("d", [start]) * len(self.members)
+        dist[source] = 0
+        heap = [source]
+        while heap:
+            a = heappop(heap)
+            d = dist[a]
+            for b, cost in costs[a].items():
+                if dist[b] == start:
+                    heappush(heap, b)
+                    dist[b] = d + cost
+                elif better(d + cost, dist[b]):
+                    dist[b] = d + cost
+        return dist
+
+    def shortest_paths(self, vertex: int) -> array:
+        # returns the cost of a minimum cost walk in the DAG from the component of vertex to every component
+        # as an array('d') indexed by component id, math.inf marks the components that can't be reached
+        # negative costs are fine since the DAG has no cycles
+        return self._relax(vertex, self.min_cost, math.inf, lt)
+
+    def longest_paths(self, vertex: int) -> array:
+        # like shortest_paths for maximum cost walks, -math.inf marks the components that can't be reached
+        return self._relax(vertex, self.max_cost, -math.inf, gt)
+
+    def transitive_reduction(self) -> list:
+        # returns the (component1, component2) edges of the DAG that aren't implied by a longer walk
+        # reach[c] is the bitset of the components accessible from c, built in reverse topological order
+        reach = [0] * len(self.members)
+        reduced = []
+        for a in range(len(self.members) - 1, -1, -1):
+            covered = 0
+            # the nearest successors come first, anything they reach is implied
+            for b in sorted(self.min_cost[a]):
+                if not covered >> b & 1:
+                    reduced.append((a, b))
+                    covered |= reach[b] | 1 << b
+            reach[a] = covered
+        reduced.sort()
+        return reduced
+
+# positions an IncrementalSCC component starts out with, see IncrementalSCC._room
+_SCC_ROOM = 1 << 32
+
+class IncrementalSCC:
+    # keeps the strongly connected components of a DirectedGraph up to date while edges are streamed in
+    # all changes have to go through this object, the graph itself is available as .graph
+    # members[label] is the set of vertices of a component,
+    # dag[label] maps every component reached by an edge leaving it to the number of such edges
+    # _position orders the components topologically, so an inserted edge that agrees with the order
+    # costs O(1) and otherwise only the components positioned between its endpoints are searched
+    # (Pearce-Kelly), a new cycle merges the components on it into one
+    # removing an edge inside a component recomputes only that component
+    # positions are spaced apart, _room[p] positions from p on belong to the component at p, so the parts
+    # of a split component are placed within its room and the order is only renumbered once that runs out
+    __slots__ = ("graph", "members", "dag", "_dag_in", "_label", "_position", "_room", "_next_label", "_next_position")
+
+    def __init__(self, g: "DirectedGraph"):
+        self.graph = g
+        labels = strongly_connected_labels(g)
+        count = max(labels, default=-1) + 1
+        self.members = {label: set() for label in range(count)}
+        self.dag = {label: {} for label in range(count)}
+        self._dag_in = {label: {} for label in range(count)}
+        self._label = {}
+        for vertex, label in zip(g.vertices(), labels):
+            self._label[vertex] = label
+            self.members[label].add(vertex)
+        for vertex1, vertex2, _ in g.edges():
+            self._link(self._label[vertex1], self._label[vertex2], 1)
+        # Tarjan completes the components in reverse topological order
+        self._renumber(range(count - 1, -1, -1))
+        self._next_label = count
+
+    def _link(self, a: int, b: int, count: int) -> None:
+        # adds count edges from component a to component b to the condensation
+        if a != b:
+            self.dag[a][b] = self.dag[a].get(b, 0) + count
+            self._dag_in[b][a] = self._dag_in[b].get(a, 0) + count
+
+    def _unlink(self, a: int, b: int) -> None:
+        if a != b:
+            if self.dag[a][b] == 1:
+                del self.dag[a][b]
+                del self._dag_in[b][a]
+            else:
+                self.dag[a][b] -= 1
+                self._dag_in[b][a] -= 1
+
+    def _renumber(self, order: list) -> None:
+        # spaces the components out again in the given order
+        self._position = {label: i * _SCC_ROOM for i, label in enumerate(order)}
+        self._room = dict.fromkeys(self._position.values(), _SCC_ROOM)
+        self._next_position = len(order) * _SCC_ROOM
+
+    def _new_label(self) -> int:
+        label = self._next_label
+        self._next_label += 1
+        self.members[label] = set()
+        self.dag[label] = {}
+        self._dag_in[label] = {}
+        return label
+
+    def _search(self, start: int, edges: dict, low: int, high: int) -> set:
+        # components reachable from start over edges whose position lies within [low, high]
+        position = self._position
+        seen = {start}
+        stack = [start]
+        while stack:
+            for nxt in edges[stack.pop()]:
+                if nxt not in seen and low <= position[nxt] <= high:
+                    seen.add(nxt)
+                    stack.append(nxt)
+        return seen
+
+    def _merge(self, labels: set) -> int:
+        # merges the components into the largest of them, which keeps its label
+        target = max(labels, key=lambda label: len(self.members[label]))
+        for label in labels:
+            if label == target:
+                continue
+            for vertex in self.members[label]:
+                self._label[vertex] = target
+            self.members[target] |= self.members.pop(label)
+            del self._position[label]
+            # edges between the merged components end up inside target and are dropped
+            for out, count in self.dag.pop(label).items():
+                if out in self._dag_in:
+                    del self._dag_in[out][label]
+                if out not in labels:
+                    self._link(target, out, count)
+            for node, count in self._dag_in.pop(label).items():
+                if node in self.dag:
+                    del self.dag[node][label]
+                if node not in labels:
+                    self._link(node, target, count)
+        return target
+
+    def _split(self, label: int) -> None:
+        # recomputes the components of the vertices that were in the component label
+        vertices = self.members[label]
+        view = SubgraphView(self.graph, vertices)
+        sub = strongly_connected_labels(view)
+        count = max(sub, default=-1) + 1
+        if count <= 1:
+            return
+        for out in self.dag[label]:
+            del self._dag_in[out][label]
+        for node in self._dag_in[label]:
+            del self.dag[node][label]
+        self.dag[label] = {}
+        self._dag_in[label] = {}
+        # the last completed part keeps the label, it comes first topologically
+        parts = [self._new_label() for _ in range(count - 1)] + [label]
+        self.members[label] = set()
+        for vertex, part in zip(view.vertices(), sub):
+            self._label[vertex] = parts[part]
+            self.members[parts[part]].add(vertex)
+        for vertex in vertices:
+            for out in self.graph.outbound(vertex):
+                self._link(self._label[vertex], self._label[out], 1)
+            for node in self.graph.inbound(vertex):
+                if node not in vertices:
+                    self._link(self._label[node], self._label[vertex], 1)
+        # the parts share the room of label, in reverse so that they stay in topological order
+        start = self._position[label]
+        step = self._room[start] // count
+        if not step:
+            order = sorted(self._position, key=self._position.__getitem__)
+            i = order.index(label)
+            order[i:i + 1] = reversed(parts)
+            self._renumber(order)
+            return
+        del self._room[start]
+        for i, part in enumerate(reversed(parts)):
+            self._position[part] = start + i * step
+            self._room[start + i * step] = step
+
+    def add_vertex(self, vertex: int) -> bool:
+        if not self.graph.add_vertex(vertex):
+            return False
+        label = self._new_label()
+        self.members[label].add(vertex)
+        self._label[vertex] = label
+        self._position[label] = self._next_position
+        self._room[self._next_position] = _SCC_ROOM
+        self._next_position += _SCC_ROOM
+        return True
+
+    def remove_vertex(self, vertex: int) -> bool:
+        if not self.graph.is_vertex(vertex):
+            return False
+        label = self._label.pop(vertex)
+        for out in self.graph.outbound(vertex):
+            if out != vertex:
+                self._unlink(label, self._label[out])
+        for node in self.graph.inbound(vertex):
+            if node != vertex:
+                self._unlink(self._label[node], label)
+        self.graph.remove_vertex(vertex)
+        self.members[label].discard(vertex)
+        if self.members[label]:
+            self._split(label)
+        else:
+            del self.members[label], self.dag[label], self._dag_in[label]
+            del self._room[self._position.pop(label)]
+        return True
+
+    def add_edge(self, vertex1: int, vertex2: int, cost: int) -> bool:
+        if not self.graph.add_edge(vertex1, vertex2, cost):
+            return False
+        a = self._label[vertex1]
+        b = self._label[vertex2]
+        if a == b:
+            return True
+        self._link(a, b, 1)
+        low = self._position[b]
+        high = self._position[a]
+        if high < low:
+            # the edge agrees with the topological order
+            return True
+        # every component on a new cycle is reachable from b and reaches a,
+        # so its position lies between those of b and a
+        forward = self._search(b, self.dag, low, high)
+        backward = self._search(a, self._dag_in, low, high)
+        cycle = forward & backward
+        before = sorted(backward - cycle, key=self._position.__getitem__)
+        after = sorted(forward - cycle, key=self._position.__getitem__)
+        # the affected components are reordered within the positions they held, those before the new edge
+        # take the lowest and those after it the highest, so nothing moves past an unaffected neighbour
+        pool = sorted(self._position[label] for label in forward | backward)
+        if cycle:
+            before.append(self._merge(cycle))
+        for label, position in zip(before, pool):
+            self._position[label] = position
+        for label, position in zip(after, pool[len(pool) - len(after):]):
+            self._position[label] = position
+        # the positions left over by merged components are freed
+        for position in pool[len(before):len(pool) - len(after)]:
+            del self._room[position]
+        return True
+
+    def remove_edge(self, vertex1: int, vertex2: int) -> bool:
+        if not self.graph.remove_edge(vertex1, vertex2):
+            return False
+        a = self._label[vertex1]
+        b = self._label[vertex2]
+        if a != b:
+            self._unlink(a, b)
+        elif not self._still_reaches(vertex1, vertex2, self.members[a]):
+            # otherwise every walk that used the edge can go around it and the component stays whole
+            self._split(a)
+        return True
+
+    def _still_reaches(self, vertex1: int, vertex2: int, vertices: set) -> bool:
+        # searches from vertex1 inside the component, stopping as soon as vertex2 is found
+        seen = {vertex1}
+        stack = [vertex1]
+        while stack:
+            for out in self.graph.outbound(stack.pop()):
+                if out == vertex2:
+                    return True
+                if out not in seen and out in vertices:
+                    seen.add(out)
+                    stack.append(out)
+        return False
+
+    def component(self, vertex: int) -> int:
+        # returns the label of the component of the vertex, labels stay valid until the component changes
+        if vertex not in self._label:
+            raise GraphError("vertex does not exist")
+        return self._label[vertex]
+
+    def same_component(self, vertex1: int, vertex2: int) -> bool:
+        return self.component(vertex1) == self.component(vertex2)
+
+    def reaches(self, vertex1: int, vertex2: int) -> bool:
+        # True if vertex2 is accessible from vertex1, searching only the components ordered between them
+        a = self.component(vertex1)
+        b = self.component(vertex2)
+        if a == b:
+            return True
+        if self._position[a] > self._position[b]:
+            return False
+        return b in self._search(a, self.dag, self._position[a], self._position[b])
+
+    def component_count(self) -> int:
+        return len(self.members)
+
+    def components(self) -> list:
+        # returns the components as views of the graph in topological order
+        return [SubgraphView(self.graph, self.members[label]) for label in sorted(self.members, key=self._position.__getitem__)]
+
+def biconnected_decomposition(g: "DirectedGraph") -> tuple:
+    # Hopcroft-Tarjan with an explicit call stack and an edge stack
+    # the graph is read as undirected, as produced by read_graph_from_file (both directions present)
+    # returns (blocks, articulation_points, bridges) where every block is the list of its edges,
+    # each undirected edge appearing once, vertices without edges belong to no block
+    order = list(g.vertices())
+    index = {vertex: i for i, vertex in enumerate(order)}
+    n = len(order)
+    indices = array("q", [-1]) * n
+    lowlink = array("q", [0]) * n
+    edge_stack = []
+    blocks = []
+    articulation_points = set()
+    bridges = []
+    counter = 0
+    for root in range(n):
+        if indices[root] != -1:
+            continue
+        indices[root] = lowlink[root] = counter
+        counter += 1
+        root_children = 0
+        calls = [(root, -1, g.outbound(order[root]))]
+        while calls:
+            v, parent, neighbours = calls[-1]
+            for out in neighbours:
+                w = index[out]
+                if indices[w] == -1:
+                    # tree edge
+                    edge_stack.append((v, w))
+                    indices[w] = lowlink[w] = counter
+                    counter += 1
+                    calls.append((w, v, g.outbound(out)))
+                    break
+                if w != parent and indices[w] < indices[v]:
+                    # back edge to an ancestor, the edge from the ancestor's side is skipped
+                    edge_stack.append((v, w))
+                    if indices[w] < lowlink[v]:
+                        lowlink[v] = indices[w]
+            else:
+                calls.pop()
+                if not calls:
+                    continue
+                u = calls[-1][0]
+                if lowlink[v] < lowlink[u]:
+                    lowlink[u] = lowlink[v]
+                if lowlink[v] >= indices[u]:
+                    # nothing below v climbs above u, so the edges down to (u, v) form a block
+                    block = []
+                    while True:
+                        edge = edge_stack.pop()
+                        block.append((order[edge[0]], order[edge[1]]))
+                        if edge == (u, v):
+                            break
+                    blocks.append(block)
+                    if lowlink[v] > indices[u]:
+                        bridges.append((order[u], order[v]))
+                    if u == root:
+                        root_children += 1
+                    else:
+                        articulation_points.add(order[u])
+        if root_children > 1:
+            articulation_points.add(order[root])
+    return blocks, articulation_points, bridges
 
 def biconnected_components(g: "DirectedGraph") -> list:
-    # returns the biconnected components of the graph generated as graph objects
-    visited = set()
-    stack = []
+    # returns the biconnected components of the graph as views of it
+    # an edge between two vertices of a block belongs to that block, so each view holds exactly the block's edges
+    # vertices without edges are returned as single vertex components
+    blocks, _, _ = biconnected_decomposition(g)
     components = []
-    index = 0
-    indices = {}
-    lowlink = {}
-
-    def biconnected(v):
-        nonlocal index
-        indices[v] = index
-        lowlink[v] = index
-        index += 1
-        stack.append(v)
-        visited.add(v)
-
-        for w in g.outbound(v):
-            if w not in indices:
-                biconnected(w)
-                lowlink[v] = min(lowlink[v], lowlink[w])
-            elif w in stack:
-                lowlink[v] = min(lowlink[v], indices[w])
-
-        if lowlink[v] == indices[v]:
-            component = DirectedGraph()
-            while True:
-                w = stack.pop()
-                component.add_vertex(w)
-                for x in g.outbound(w):
-                    if x in component.vertices():
-                        component.add_edge(w, x, g.get_cost(w, x))
-                if w == v:
+    covered = set()
+    for block in blocks:
+        vertices = dict.fromkeys(vertex for edge in block for vertex in edge)
+        covered.update(vertices)
+        components.append(SubgraphView(g, vertices))
+    for vertex in g.vertices():
+        if vertex not in covered:
+            components.append(SubgraphView(g, [vertex]))
+    return components
+
+def topological_sort(g: "DirectedGraph") -> list:
+    # Kahn's algorithm, returns the vertices so that every edge goes from an earlier to a later one
+    # raises CycleError with a strongly connected component on a cycle if there is no such order
+    remaining = {vertex: g.in_degree(vertex) for vertex in g.vertices()}
+    order = [vertex for vertex, degree in remaining.items() if degree == 0]
+    # order doubles as the queue, the loop also visits the vertices appended while it runs
+    for vertex in order:
+        for out in g.outbound(vertex):
+            remaining[out] -= 1
+            if remaining[out] == 0:
+                order.append(out)
+    if len(order) < len(remaining):
+        # the vertices left behind are on a cycle or after one
+        left = SubgraphView(g, [vertex for vertex, degree in remaining.items() if degree > 0])
+        for component in strongly_connected_components(left):
+            vertex = next(component.vertices())
+            if component.vertice_count() > 1 or g.is_edge(vertex, vertex):
+                raise CycleError(component)
+    return order
+
+class Schedule:
+    # start times of the vertices of an activity graph in which an edge vertex1 -> vertex2 with cost d
+    # means that vertex2 can start d after vertex1 has started, e.g. d is the duration of vertex1
+    # earliest[i] and latest[i] are the earliest and latest start of order[i] that keep the makespan,
+    # the earliest start of all vertices, slack is the difference between the two
+    __slots__ = ("order", "earliest", "latest", "makespan", "_index", "_previous")
+
+    def __init__(self, order: list, earliest: array, latest: array, previous: array):
+        self.order = order
+        self.earliest = earliest
+        self.latest = latest
+        self.makespan = max(earliest, default=0)
+        self._index = {vertex: i for i, vertex in enumerate(order)}
+        self._previous = previous
+
+    def _position(self, vertex: int) -> int:
+        if vertex not in self._index:
+            raise GraphError("vertex does not exist")
+        return self._index[vertex]
+
+    def earliest_start(self, vertex: int) -> int:
+        return self.earliest[self._position(vertex)]
+
+    def latest_start(self, vertex: int) -> int:
+        return self.latest[self._position(vertex)]
+
+    def slack(self, vertex: int) -> int:
+        i = self._position(vertex)
+        return self.latest[i] - self.earliest[i]
+
+    def critical_path(self) -> list:
+        # a chain of vertices without slack from a vertex starting at 0 to one starting at the makespan
+        if not self.order:
+            return []
+        i = self.earliest.index(self.makespan)
+        path = []
+        while i != -1:
+            path.append(self.order[i])
+            i = self._previous[i]
+        path.reverse()
+        return path
+
+def schedule(g: "DirectedGraph") -> "Schedule":
+    # critical path method in O(V + E), a forward pass in topological order gives the earliest starts
+    # and a backward pass the latest ones, nothing starts before 0
+    # raises CycleError if the dependencies have a cycle
+    order = topological_sort(g)
+    # both passes work on dicts keyed by vertex, which saves mapping every edge to positions
+    earliest = dict.fromkeys(order, 0)
+    previous = {}
+    for vertex in order:
+        start = earliest[vertex]
+        for out, cost in g.outbound_edges(vertex):
+            if start + cost > earliest[out] or (start + cost == earliest[out] and out not in previous):
+                earliest[out] = start + cost
+                previous[out] = vertex
+    makespan = max(earliest.values(), default=0)
+    latest = dict.fromkeys(order, makespan)
+    for vertex in reversed(order):
+        start = latest[vertex]
+        for out, cost in g.outbound_edges(vertex):
+            if latest[out] - cost < start:
+                start = latest[out] - cost
+        latest[vertex] = start
+    index = {vertex: i for i, vertex in enumerate(order)}
+    return Schedule(order, array("q", earliest.values()), array("q", latest.values()),
+                    array("q", [index[previous[vertex]] if vertex in previous else -1 for vertex in order]))
+
+# auto switches to Prim once edges / vertices^2 reaches this density
+_PRIM_DENSITY = 0.05
+
+def _kruskal(g: "DirectedGraph") -> tuple:
+    # sorts all edges by cost in one call and keeps those joining two trees of the union-find
+    order = list(g.vertices())
+    index = {vertex: i for i, vertex in enumerate(order)}
+    n = len(order)
+    edges = [(cost, index[vertex1], index[vertex2]) for vertex1, vertex2, cost in g.edges() if vertex1 != vertex2]
+    edges.sort(key=itemgetter(0))
+    parent = array("q", range(n))
+    rank = bytearray(n)
+    forest = []
+    total = 0
+    for cost, i, j in edges:
+        if _union(parent, rank, i, j):
+            forest.append((order[i], order[j], cost))
+            total += cost
+            if len(forest) == n - 1:
+                break
+    return forest, total
+
+def _prim(g: "DirectedGraph") -> tuple:
+    # grows one tree per component, best[v] is the cheapest known edge joining v to the tree
+    # an edge is only pushed when it improves on best, so the heap stays small on dense graphs
+    in_tree = set()
+    forest = []
+    total = 0
+    for root in g.vertices():
+        if root in in_tree:
+            continue
+        best = {}
+        heap = [(0, root)]
+        while heap:
+            cost, vertex = heappop(heap)
+            if vertex in in_tree:
+                continue
+            in_tree.add(vertex)
+            if vertex != root:
+                edge = best[vertex]
+                forest.append(edge)
+                total += edge[2]
+            for out, cost in g.outbound_edges(vertex):
+                if out not in in_tree and (out not in best or cost < best[out][2]):
+                    best[out] = (vertex, out, cost)
+                    heappush(heap, (cost, out))
+            for node in g.inbound(vertex):
+                if node not in in_tree:
+                    cost = g.get_cost(node, vertex)
+                    if node not in best or cost < best[node][2]:
+                        best[node] = (node, vertex, cost)
+                        heappush(heap, (cost, node))
+    return forest, total
+
+def minimum_spanning_forest(g: "DirectedGraph", algorithm: str = "auto") -> tuple:
+    # treats every edge as undirected, returns (edges, total cost) of a minimum cost spanning forest
+    # edges are (vertex1, vertex2, cost) triples as stored in the graph, one tree per weakly connected component
+    # algorithm is "kruskal" (sparse graphs), "prim" (dense graphs) or "auto"
+    if algorithm == "auto":
+        n = g.vertice_count()
+        algorithm = "prim" if g.edge_count() >= _PRIM_DENSITY * n * n else "kruskal"
+    if algorithm == "kruskal":
+        return _kruskal(g)
+    if algorithm == "prim":
+        return _prim(g)
+    raise GraphError(f"unknown algorithm {algorithm}")
+
+class Flow:
+    # result of max_flow, flow[(vertex1, vertex2)] is the flow on every edge of the graph
+    # source_side holds the vertices still reachable from the source in the residual graph, they and
+    # sink_side form a minimum cut, cut lists the edges across it, their capacities add up to value
+    __slots__ = ("value", "flow", "source_side", "sink_side", "cut")
+
+    def __init__(self, value: int, flow: dict, source_side: set, sink_side: set, cut: list):
+        self.value = value
+        self.flow = flow
+        self.source_side = source_side
+        self.sink_side = sink_side
+        self.cut = cut
+
+class _Residual:
+    # flat residual network, arc 2k is the k-th edge and arc 2k + 1 its reverse, so a ^ 1 pairs them
+    # head[a] is the position the arc leads to and capacity[a] what is left of it,
+    # the arcs leaving position v are arcs[offsets[v]:offsets[v + 1]]
+    __slots__ = ("order", "edges", "head", "capacity", "offsets", "arcs")
+
+    def __init__(self, g: "DirectedGraph"):
+        self.order = list(g.vertices())
+        index = {vertex: i for i, vertex in enumerate(self.order)}
+        self.edges = []
+        self.head = array("q")
+        self.capacity = array("q")
+        tails = array("q")
+        for vertex1, vertex2, cost in g.edges():
+            if cost < 0:
+                raise GraphError("negative capacity")
+            if vertex1 == vertex2:
+                # a self loop can't carry flow anywhere
+                continue
+            i = index[vertex1]
+            j = index[vertex2]
+            self.edges.append((vertex1, vertex2))
+            self.head.extend((j, i))
+            self.capacity.extend((cost, 0))
+            tails.extend((i, j))
+        self.arcs = array("q", sorted(range(len(tails)), key=tails.__getitem__))
+        self.offsets = _row_offsets(array("q", map(tails.__getitem__, self.arcs)), len(self.order))
+
+    def distances(self, start: int, reverse: bool, distance: array, base: int) -> None:
+        # BFS over the arcs with capacity left, sets distance[v] = base + the number of arcs between v
+        # and start for every v with distance[v] == -1, towards start if reverse, away from it otherwise
+        head, capacity, offsets, arcs = self.head, self.capacity, self.offsets, self.arcs
+        distance[start] = base
+        queue = [start]
+        # the list doubles as the queue
+        for v in queue:
+            for a in arcs[offsets[v]:offsets[v + 1]]:
+                w = head[a]
+                if distance[w] == -1 and capacity[a ^ 1 if reverse else a] > 0:
+                    distance[w] = distance[v] + 1
+                    queue.append(w)
+
+    def result(self, g: "DirectedGraph", s: int, value: int) -> "Flow":
+        n = len(self.order)
+        reached = array("q", [-1]) * n
+        self.distances(s, False, reached, 0)
+        source_side = {vertex for vertex, d in zip(self.order, reached) if d != -1}
+        sink_side = {vertex for vertex, d in zip(self.order, reached) if d == -1}
+        flow = {}
+        cut = []
+        for vertex1, vertex2, cost in g.edges():
+            flow[vertex1, vertex2] = 0
+            if vertex1 in source_side and vertex2 in sink_side:
+                cut.append((vertex1, vertex2))
+        for k, edge in enumerate(self.edges):
+            # what went through an edge shows up as capacity of its reverse arc
+            flow[edge] = self.capacity[2 * k + 1]
+        return Flow(value, flow, source_side, sink_side, cut)
+
+def _dinic(r: "_Residual", s: int, t: int) -> int:
+    # repeats a BFS level graph and a blocking flow in it, found with an iterative DFS that keeps
+    # the arcs of the current path on a stack and skips dead arcs for good through next_arc
+    head, capacity, offsets, arcs = r.head, r.capacity, r.offsets, r.arcs
+    n = len(r.order)
+    total = 0
+    while True:
+        level = array("q", [-1]) * n
+        r.distances(s, False, level, 0)
+        if level[t] == -1:
+            return total
+        next_arc = array("q", offsets)
+        path = []
+        v = s
+        while True:
+            if v == t:
+                pushed = min(map(capacity.__getitem__, path))
+                for a in path:
+                    capacity[a] -= pushed
+                    capacity[a ^ 1] += pushed
+                total += pushed
+                # go back to the tail of the first saturated arc
+                k = 0
+                while capacity[path[k]]:
+                    k += 1
+                del path[k:]
+                v = head[path[-1]] if path else s
+                continue
+            i = next_arc[v]
+            end = offsets[v + 1]
+            while i < end:
+                a = arcs[i]
+                if capacity[a] and level[head[a]] == level[v] + 1:
                     break
-            components.append(component)
+                i += 1
+            next_arc[v] = i
+            if i < end:
+                path.append(arcs[i])
+                v = head[arcs[i]]
+            elif v == s:
+                break
+            else:
+                # v is a dead end, retreat and skip the arc that led here
+                a = path.pop()
+                v = head[a ^ 1]
+                next_arc[v] += 1
 
-    for v in g.vertices():
-        if v not in visited:
-            biconnected(v)
+def _push_relabel(r: "_Residual", s: int, t: int) -> int:
+    # FIFO push-relabel, heights below n are distances to the sink and heights above n send
+    # leftover excess back to the source, so the result is a flow and not just a preflow
+    # gap heuristic: once no vertex is left at some height below n, the vertices above it can't
+    # reach the sink and are lifted over n at once
+    # global relabel: heights are recomputed by BFS after every n relabels
+    head, capacity, offsets, arcs = r.head, r.capacity, r.offsets, r.arcs
+    n = len(r.order)
+    excess = array("q", [0]) * n
+    height = array("q", [0]) * n
+    count = array("q", [0]) * (2 * n + 1)
+    next_arc = array("q", offsets)
 
-    return components
+    def global_relabel():
+        height[:] = array("q", [-1]) * n
+        r.distances(t, True, height, 0)
+        height[s] = -1
+        r.distances(s, True, height, n)
+        for v in range(n):
+            if height[v] == -1:
+                height[v] = 2 * n
+        count[:] = array("q", [0]) * (2 * n + 1)
+        for h in height:
+            count[h] += 1
+        next_arc[:] = array("q", offsets)
 
-def shortest_walk(g: DirectedGraph, u: int, v: int) -> list:
-    # Floyd Warshall algorith for shortest path between two nodes
-    # returns the shortest path between u and v
-    if u not in g.vertices() or v not in g.vertices():
-        raise GraphError("vertex does not exist")
-    dist = {}
-    next_node = {}
-    for i in g.vertices():
-        dist[(i, i)] = 0
-        next_node[(i, i)] = i
-        for j in g.vertices(i):
-            if g.is_edge(i, j):
-                dist[(i, j)] = g.get_cost(i, j)
-                next_node[(i, j)] = j
+    active = deque()
+    for a in arcs[offsets[s]:offsets[s + 1]]:
+        if capacity[a]:
+            w = head[a]
+            if not excess[w] and w != t:
+                active.append(w)
+            excess[w] += capacity[a]
+            capacity[a ^ 1] += capacity[a]
+            capacity[a] = 0
+    global_relabel()
+    relabels = 0
+    while active:
+        v = active.popleft()
+        if v == s or v == t:
+            continue
+        while excess[v]:
+            i = next_arc[v]
+            if i == offsets[v + 1]:
+                # relabel to one above the lowest neighbour still reachable
+                old = height[v]
+                new = 2 * n
+                for a in arcs[offsets[v]:offsets[v + 1]]:
+                    if capacity[a] and height[head[a]] + 1 < new:
+                        new = height[head[a]] + 1
+                count[old] -= 1
+                height[v] = new
+                count[new] += 1
+                next_arc[v] = offsets[v]
+                if old < n and not count[old]:
+                    for u in range(n):
+                        if old < height[u] < n:
+                            count[height[u]] -= 1
+                            height[u] = n + 1
+                            count[n + 1] += 1
+                            next_arc[u] = offsets[u]
+                relabels += 1
+                if relabels % n == 0:
+                    global_relabel()
+                continue
+            a = arcs[i]
+            w = head[a]
+            if capacity[a] and height[v] == height[w] + 1:
+                pushed = min(excess[v], capacity[a])
+                capacity[a] -= pushed
+                capacity[a ^ 1] += pushed
+                excess[v] -= pushed
+                if not excess[w] and w != s and w != t:
+                    active.append(w)
+                excess[w] += pushed
             else:
-                dist[(i, j)] = math.inf
-                next_node[(i, j)] = None
-    for k in g.vertices():
-        for i in g.vertices():
-            for j in g.vertices():
-                if dist[(i, k)] + dist[(k, j)] < dist[(i, j)]:
-                    dist[(i, j)] = dist[(i, k)] + dist[(k, j)]
-                    next_node[(i, j)] = next_node[(i, k)]
-    if dist[(u, v)] == math.inf:
-        raise GraphError("no path exists")
+                next_arc[v] = i + 1
+    return excess[t]
+
+def max_flow(g: "DirectedGraph", source: int, sink: int, algorithm: str = "dinic") -> "Flow":
+    # maximum flow from source to sink using the edge costs as capacities, returns a Flow
+    # algorithm is "dinic" or "push_relabel", both work on a residual copy and leave g unchanged
+    if not g.is_vertex(source) or not g.is_vertex(sink):
+        raise GraphError("vertex does not exist")
+    if source == sink:
+        raise GraphError("source and sink must differ")
+    r = _Residual(g)
+    s = r.order.index(source)
+    t = r.order.index(sink)
+    if algorithm == "dinic":
+        value = _dinic(r, s, t)
+    elif algorithm == "push_relabel":
+        value = _push_relabel(r, s, t)
+    else:
+        raise GraphError(f"unknown algorithm {algorithm}")
+    return r.result(g, s, value)
+
+def _dijkstra(g: "DirectedGraph", source: int, targets: set) -> tuple:
+    dist = {source: 0}
+    prev = {source: None}
+    settled = set()
+    heap = [(0, source)]
+    remaining = len(targets)
+    while heap:
+        d, node = heappop(heap)
+        if node in settled:
+            continue
+        settled.add(node)
+        if node in targets:
+            remaining -= 1
+            if remaining == 0:
+                # every requested target has its final distance
+                break
+        for out, cost in g.outbound_edges(node):
+            if out not in dist or d + cost < dist[out]:
+                dist[out] = d + cost
+                prev[out] = node
+                heappush(heap, (d + cost, out))
+    return dist, prev
+
+def _spfa(g: "DirectedGraph", source: int) -> tuple:
+    # queue based Bellman-Ford, a shortest path uses at most n - 1 edges
+    # so a vertex whose path grows to n edges lies on or behind a negative cycle
+    n = g.vertice_count()
+    dist = {source: 0}
+    prev = {source: None}
+    length = {source: 0}
+    queue = deque([source])
+    in_queue = {source}
+    while queue:
+        node = queue.popleft()
+        in_queue.discard(node)
+        d = dist[node]
+        for out, cost in g.outbound_edges(node):
+            if out not in dist or d + cost < dist[out]:
+                dist[out] = d + cost
+                prev[out] = node
+                length[out] = length[node] + 1
+                if length[out] >= n:
+                    raise GraphError("negative cost cycle reachable from vertex")
+                if out not in in_queue:
+                    in_queue.add(out)
+                    queue.append(out)
+    return dist, prev
+
+def single_source_shortest_paths(g: "DirectedGraph", source: int, targets = None) -> tuple:
+    # returns (dist, prev) dicts over the vertices reachable from source
+    # prev maps each vertex to its predecessor on a shortest walk (None for the source)
+    # uses Dijkstra when all costs are non-negative, SPFA with negative cycle detection otherwise
+    # with targets given, Dijkstra stops as soon as all of them are settled
+    if not g.is_vertex(source):
+        raise GraphError("vertex does not exist")
+    if any(cost < 0 for _, _, cost in g.edges()):
+        return _spfa(g, source)
+    return _dijkstra(g, source, set(targets) if targets is not None else set())
+
+def walk_to(prev: dict, v: int) -> list:
+    # rebuilds the walk ending in v from a predecessor dict
     path = []
-    while u != v:
+    while v is not None:
+        path.append(v)
+        v = prev[v]
+    path.reverse()
+    return path
+
+class ShortestPathCache:
+    # LRU cache of single source shortest path trees (dist, prev) keyed by source
+    # a tree is computed for the whole graph so later queries from the same source hit the cache,
+    # every tree is dropped once the version of the graph has changed
+    __slots__ = ("capacity", "hits", "misses", "evictions", "invalidations", "_trees", "_version")
+
+    def __init__(self, capacity: int = 64):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        # insertion ordered, the least recently used source comes first
+        self._trees = {}
+        self._version = None
+
+    def lookup(self, g: "DirectedGraph", source: int) -> tuple:
+        # returns the (dist, prev) dicts of single_source_shortest_paths(g, source), they must not be modified
+        if self._version != g._version:
+            if self._trees:
+                self.invalidations += 1
+                self._trees.clear()
+            self._version = g._version
+        tree = self._trees.pop(source, None)
+        if tree is None:
+            tree = single_source_shortest_paths(g, source)
+            self.misses += 1
+            if self._trees and len(self._trees) >= self.capacity:
+                del self._trees[next(iter(self._trees))]
+                self.evictions += 1
+        else:
+            self.hits += 1
+        if self.capacity > 0:
+            self._trees[source] = tree
+        return tree
+
+    def clear(self) -> None:
+        self._trees.clear()
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "invalidations": self.invalidations, "size": len(self._trees)}
+
+def shortest_walk(g: "DirectedGraph", u: int, v: int) -> tuple:
+    # returns (cost, path) of a minimum cost walk from u to v
+    # on a DirectedGraph the shortest path tree of u is kept in g.shortest_path_cache()
+    if not g.is_vertex(u) or not g.is_vertex(v):
+        raise GraphError("vertex does not exist")
+    if isinstance(g, DirectedGraph):
+        dist, prev = g.shortest_path_cache().lookup(g, u)
+    else:
+        dist, prev = single_source_shortest_paths(g, u, [v])
+    if v not in dist:
+        raise GraphError("no path exists")
+    return dist[v], walk_to(prev, v)
+
+def batch_shortest_paths(g: "DirectedGraph", pairs) -> array:
+    # returns the costs of minimum cost walks for many (source, target) pairs as an array('d')
+    # aligned with pairs, math.inf marks a pair with no walk
+    # the pairs are grouped by source so every distinct source is searched once,
+    # and the negative cost check over the edges is done once for the whole batch
+    pairs = list(pairs)
+    targets = {}
+    for u, v in pairs:
+        if not g.is_vertex(u) or not g.is_vertex(v):
+            raise GraphError("vertex does not exist")
+        targets.setdefault(u, set()).add(v)
+    negative = any(cost < 0 for _, _, cost in g.edges())
+    dist = {}
+    for u, wanted in targets.items():
+        dist[u] = _spfa(g, u)[0] if negative else _dijkstra(g, u, wanted)[0]
+    return array("d", [dist[u].get(v, math.inf) for u, v in pairs])
+
+class ShortestPathMatrix:
+    # all pairs shortest path result over the vertices in order
+    # dist[i][j] is the cost of a minimum cost walk from order[i] to order[j] (math.inf if there is none)
+    # pred[i][j] is the position of the vertex before order[j] on that walk (-1 if there is none)
+    __slots__ = ("order", "dist", "pred", "_index")
+
+    def __init__(self, order: list, dist: list, pred: list):
+        self.order = order
+        self.dist = dist
+        self.pred = pred
+        self._index = {vertex: i for i, vertex in enumerate(order)}
+
+    def _position(self, vertex: int) -> int:
+        if vertex not in self._index:
+            raise GraphError("vertex does not exist")
+        return self._index[vertex]
+
+    def distance(self, u: int, v: int):
+        d = self.dist[self._position(u)][self._position(v)]
+        return d if d == math.inf else int(d)
+
+    def path(self, u: int, v: int) -> list:
+        i = self._position(u)
+        j = self._position(v)
+        if self.dist[i][j] == math.inf:
+            raise GraphError("no path exists")
+        path = []
+        while j != i:
+            path.append(self.order[j])
+            j = self.pred[i][j]
         path.append(u)
-        u = next_node[(u, v)]
-    path.append(v)
-    return path
\ No newline at end of file
+        path.reverse()
+        return path
+
+def _indexed_edges(g: "DirectedGraph") -> tuple:
+    # returns the vertex order and the adjacency lists of (position, cost) pairs
+    order = list(g.vertices())
+    index = {vertex: i for i, vertex in enumerate(order)}
+    adj = [[] for _ in order]
+    for vertex1, vertex2, cost in g.edges():
+        adj[index[vertex1]].append((index[vertex2], cost))
+    return order, adj
+
+def _johnson(adj: list) -> tuple:
+    n = len(adj)
+    # Bellman-Ford from a virtual vertex joined to every vertex with cost 0 gives the potentials
+    h = [0] * n
+    length = [0] * n
+    queue = deque(range(n))
+    in_queue = [True] * n
+    while queue:
+        i = queue.popleft()
+        in_queue[i] = False
+        for j, cost in adj[i]:
+            if h[i] + cost < h[j]:
+                h[j] = h[i] + cost
+                length[j] = length[i] + 1
+                if length[j] > n:
+                    raise GraphError("negative cost cycle")
+                if not in_queue[j]:
+                    in_queue[j] = True
+                    queue.append(j)
+    # reweighted costs cost + h[i] - h[j] are non-negative, so Dijkstra works from every vertex
+    reweighted = [[(j, cost + h[i] - h[j]) for j, cost in adj[i]] for i in range(n)]
+    dist = []
+    pred = []
+    for s in range(n):
+        d = [math.inf] * n
+        p = array("q", [-1]) * n
+        d[s] = 0
+        heap = [(0, s)]
+        while heap:
+            ds, i = heappop(heap)
+            if ds > d[i]:
+                continue
+            for j, cost in reweighted[i]:
+                if ds + cost < d[j]:
+                    d[j] = ds + cost
+                    p[j] = i
+                    heappush(heap, (ds + cost, j))
+        hs = h[s]
+        dist.append(array("d", [x - hs + h[j] if x != math.inf else x for j, x in enumerate(d)]))
+        pred.append(p)
+    return dist, pred
+
+def _floyd_warshall(adj: list) -> tuple:
+    n = len(adj)
+    dist = [[math.inf] * n for _ in range(n)]
+    pred = [array("q", [-1]) * n for _ in range(n)]
+    for i in range(n):
+        dist[i][i] = 0
+        for j, cost in adj[i]:
+            if cost < dist[i][j]:
+                dist[i][j] = cost
+                pred[i][j] = i
+    positions = range(n)
+    for k in positions:
+        row_k = dist[k]
+        pred_k = pred[k]
+        for i in positions:
+            row_i = dist[i]
+            dik = row_i[k]
+            if dik == math.inf:
+                continue
+            # relax the whole row through k at once, then patch only the improved entries
+            via = [dik + x for x in row_k]
+            pred_i = pred[i]
+            for j in compress(positions, map(lt, via, row_i)):
+                row_i[j] = via[j]
+                pred_i[j] = pred_k[j]
+    for i in positions:
+        if dist[i][i] < 0:
+            raise GraphError("negative cost cycle")
+    return [array("d", row) for row in dist], pred
+
+def all_pairs_shortest_paths(g: "DirectedGraph", method: str = "auto") -> "ShortestPathMatrix":
+    # method is "johnson" (sparse graphs), "floyd" (dense graphs) or "auto"
+    # auto compares the Johnson cost V * E * log V against the Floyd-Warshall cost V^3,
+    # a heap relaxation costs several times a row update so Floyd-Warshall only pays off near complete graphs
+    order, adj = _indexed_edges(g)
+    if method == "auto":
+        n = g.vertice_count()
+        method = "floyd" if g.edge_count() * max(1, n.bit_length()) >= 8 * n * n else "johnson"
+    if method == "johnson":
+        dist, pred = _johnson(adj)
+    elif method == "floyd":
+        dist, pred = _floyd_warshall(adj)
+    else:
+        raise GraphError(f"unknown method {method}")
+    return ShortestPathMatrix(order, dist, pred)
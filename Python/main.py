@@ -1,4 +1,4 @@
-from graph import DirectedGraph, GraphError, read_graph_from_file, write_graph_to_file, random_graph, connected_components, strongly_connected_components, biconnected_components
+from graph import DirectedGraph, GraphError, read_graph_from_file, write_graph_to_file, random_graph, connected_components, strongly_connected_components, biconnected_components, shortest_walk, is_binary_graph_file, load_binary, save_binary, BINARY_EXTENSION
 
 def print_menu():
     print()
@@ -23,6 +23,7 @@ def print_menu():
     print("19 - get strongly connected components")
     print("20 - get biconnected components")
     print("21 - get minimum cost walk")
+    print("22 - add several edges")
     print("0 - exit")
     print("=========================================")
 
@@ -126,15 +127,21 @@ def modify_cost_of_edge(graphs: list, index: int):
 
 def add_vertex(graphs: list, index: int):
     vertex = read_vertex()
-    ans = graphs[index][1].add_vertex(vertex)
-    if not ans:
-        print("vertex already exists")
+    try:
+        ans = graphs[index][1].add_vertex(vertex)
+        if not ans:
+            print("vertex already exists")
+    except GraphError as e:
+        print(e)
 
 def remove_vertex(graphs: list, index: int):
     vertex = read_vertex()
-    ans = graphs[index][1].remove_vertex(vertex)
-    if not ans:
-        print("vertex does not exist")
+    try:
+        ans = graphs[index][1].remove_vertex(vertex)
+        if not ans:
+            print("vertex does not exist")
+    except GraphError as e:
+        print(e)
 
 def add_edge(graphs: list, index: int):
     vertex1, vertex2 = read_edge()
@@ -146,11 +153,33 @@ def add_edge(graphs: list, index: int):
     except GraphError as e:
         print(e)
 
+def add_several_edges(graphs: list, index: int):
+    print("enter one edge per line as \"vertex1 vertex2 cost\", an empty line ends the list")
+    edges = []
+    while True:
+        line = input().strip()
+        if line == "":
+            break
+        try:
+            vertex1, vertex2, cost = map(int, line.split())
+        except ValueError:
+            print("please enter three integers")
+            continue
+        edges.append((vertex1, vertex2, cost))
+    try:
+        inserted, skipped = graphs[index][1].add_edges(edges)
+        print(f"{inserted} edges added, {skipped} already existed")
+    except GraphError as e:
+        print(e)
+
 def remove_edge(graphs: list, index: int):
     vertex1, vertex2 = read_edge()
-    ans = graphs[index][1].remove_edge(vertex1, vertex2)
-    if not ans:
-        print("edge does not exist")
+    try:
+        ans = graphs[index][1].remove_edge(vertex1, vertex2)
+        if not ans:
+            print("edge does not exist")
+    except GraphError as e:
+        print(e)
 
 def create_copy_of_graph(graphs: list, index: int):
     copy = graphs[index][1].copy_graph()
@@ -159,7 +188,11 @@ def create_copy_of_graph(graphs: list, index: int):
 def read_from_file(graphs: list, index: int):
     filename = input("filename: ")
     try:
-        g = read_graph_from_file(filename)
+        # binary files are recognised by their magic bytes and loaded read-only
+        if is_binary_graph_file(filename):
+            g = load_binary(filename)
+        else:
+            g = read_graph_from_file(filename)
         graphs.append((filename, g))
     except GraphError as e:
         print(e)
@@ -167,7 +200,10 @@ def read_from_file(graphs: list, index: int):
 def write_to_file(graphs: list, index: int):
     filename = input("filename: ")
     try:
-        write_graph_to_file(filename, graphs[index][1])
+        if filename.endswith(BINARY_EXTENSION):
+            save_binary(filename, graphs[index][1])
+        else:
+            write_graph_to_file(filename, graphs[index][1])
     except GraphError as e:
         print(e)
 
@@ -181,51 +217,46 @@ def create_random_graph(graphs: list, index: int):
     except GraphError as e:
         print(e)
 
-def get_connected_components(graphs: list, index: int):
-    g = graphs[index][1]
-    components = connected_components(g)
+def show_components(graphs: list, index: int, components: list):
+    # lists the components and adds only the ones asked for to the graphs
     for i in range(len(components)):
         print(f"component {i}: ")
         nodes = ""
         for node in components[i].vertices():
             nodes += str(node) + " "
         print(nodes)
-    for i in range(len(components)):
+    while True:
+        chosen = input("components to add as graphs (numbers, all, or nothing for none): ").split()
+        if chosen == ["all"]:
+            chosen = range(len(components))
+            break
+        try:
+            chosen = [int(i) for i in chosen]
+            break
+        except ValueError:
+            print("please enter component numbers")
+    for i in chosen:
+        if not 0 <= i < len(components):
+            print(f"component {i} does not exist")
+            continue
         name = f"{graphs[index][0]}_comp_{i}"
         graphs.append((name, components[i]))
 
+def get_connected_components(graphs: list, index: int):
+    show_components(graphs, index, connected_components(graphs[index][1]))
+
 def get_strongly_connected_components(graphs: list, index: int):
-    g = graphs[index][1]
-    components = strongly_connected_components(g)
-    for i in range(len(components)):
-        print(f"component {i}: ")
-        nodes = ""
-        for node in components[i].vertices():
-            nodes += str(node) + " "
-        print(nodes)
-    for i in range(len(components)):
-        name = f"{graphs[index][0]}_comp_{i}"
-        graphs.append((name, components[i]))
+    show_components(graphs, index, strongly_connected_components(graphs[index][1]))
 
 def get_biconnected_components(graphs: list, index: int):
-    g = graphs[index][1]
-    components = biconnected_components(g)
-    for i in range(len(components)):
-        print(f"component {i}: ")
-        nodes = ""
-        for node in components[i].vertices():
-            nodes += str(node) + " "
-        print(nodes)
-    for i in range(len(components)):
-        name = f"{graphs[index][0]}_comp_{i}"
-        graphs.append((name, components[i]))
+    show_components(graphs, index, biconnected_components(graphs[index][1]))
 
 def min_cost_walk(graphs: list, index: int):
     g = graphs[index][1]
     vertex1 = int(input("vertex1: "))
     vertex2 = int(input("vertex2: "))
     try:
-        cost, path = g.min_cost_walk(vertex1, vertex2)
+        cost, path = shortest_walk(g, vertex1, vertex2)
         print(f"cost: {cost}")
         print(f"path: {path}")
     except GraphError as e:
@@ -252,7 +283,8 @@ def main():
         "18": get_connected_components,
         "19": get_strongly_connected_components,
         "20": get_biconnected_components,
-        "21": min_cost_walk
+        "21": min_cost_walk,
+        "22": add_several_edges
     }
 
     g = DirectedGraph()
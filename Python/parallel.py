@@ -0,0 +1,194 @@
+import os
+from array import array
+from multiprocessing import Pool, shared_memory
+from graph import FrozenDirectedGraph, component_subgraphs
+
+# the CSR arrays of a FrozenDirectedGraph and two work arrays of n int64 each are packed into one
+# shared memory block, every worker attaches to it once and reads the graph without copying it
+OUT_OFFSETS, OUT_TARGETS, IN_OFFSETS, IN_SOURCES, LABELS, SCRATCH = range(6)
+# parts of a forward-backward search smaller than this are finished by the worker that found them
+SPLIT_SIZE = 4096
+
+# set in every worker by _attach
+_block = None
+_arrays = None
+
+def _views(block: shared_memory.SharedMemory, layout: list) -> list:
+    words = block.buf.cast("q")
+    return [words[start:start + length] for start, length in layout]
+
+def _attach(name: str, layout: list) -> None:
+    global _block, _arrays
+    _block = shared_memory.SharedMemory(name=name)
+    _arrays = _views(_block, layout)
+
+def _share(g: FrozenDirectedGraph) -> tuple:
+    # copies the CSR arrays of g into a new shared memory block, returns the block and its layout
+    n = g.vertice_count()
+    arrays = [g._out_offsets, g._out_targets, g._in_offsets, g._in_sources]
+    lengths = [len(values) for values in arrays] + [n, n]
+    layout = []
+    start = 0
+    for length in lengths:
+        layout.append((start, length))
+        start += length
+    block = shared_memory.SharedMemory(create=True, size=max(8, 8 * start))
+    views = _views(block, layout)
+    for view, values in zip(views, arrays):
+        view[:] = memoryview(values).cast("B").cast("q")
+    for view in views:
+        view.release()
+    return block, layout
+
+def _ranges(n: int, workers: int) -> list:
+    # a few ranges per worker so that uneven ranges even out
+    step = max(1, -(-n // (4 * workers)))
+    return [(lo, min(n, lo + step)) for lo in range(0, n, step)]
+
+def _run(g, workers, solve) -> array:
+    # shares g with a pool of workers, solve(pool, n, ranges, block, layout) fills LABELS,
+    # which is returned in g.vertices() order
+    if not isinstance(g, FrozenDirectedGraph):
+        g = g.freeze()
+    workers = workers or os.cpu_count() or 1
+    n = g.vertice_count()
+    block, layout = _share(g)
+    try:
+        with Pool(workers, initializer=_attach, initargs=(block.name, layout)) as pool:
+            solve(pool, n, _ranges(n, workers), block, layout)
+        views = _views(block, layout)
+        labels = array("q", views[LABELS])
+        for view in views:
+            view.release()
+    finally:
+        block.close()
+        block.unlink()
+    # labels are representative positions, number them in the order their first vertex appears
+    numbers = {}
+    return array("q", [numbers.setdefault(label, len(numbers)) for label in labels])
+
+def _propagate(lo: int, hi: int) -> bool:
+    # SCRATCH[v] becomes the lowest label around v, ignoring edge directions
+    out_offsets, out_targets, in_offsets, in_sources, labels, scratch = _arrays
+    changed = False
+    for v in range(lo, hi):
+        low = labels[v]
+        for w in out_targets[out_offsets[v]:out_offsets[v + 1]]:
+            if labels[w] < low:
+                low = labels[w]
+        for w in in_sources[in_offsets[v]:in_offsets[v + 1]]:
+            if labels[w] < low:
+                low = labels[w]
+        if low != labels[v]:
+            changed = True
+        scratch[v] = low
+    return changed
+
+def _jump(lo: int, hi: int) -> None:
+    # pointer jumping, a label is always a vertex of the same component so its own label is a shortcut
+    labels = _arrays[LABELS]
+    scratch = _arrays[SCRATCH]
+    for v in range(lo, hi):
+        labels[v] = scratch[scratch[v]]
+
+def weakly_connected_labels(g, workers: int = None) -> array:
+    # parallel graph.weakly_connected_labels, the same partition numbered the same way
+    # label propagation with pointer jumping: every vertex starts as its own label and takes the lowest
+    # label around it until nothing changes, so every component ends up labelled with its lowest position
+    def solve(pool, n, ranges, block, layout):
+        views = _views(block, layout)
+        views[LABELS][:] = array("q", range(n))
+        for view in views:
+            view.release()
+        while any(pool.starmap(_propagate, ranges)):
+            pool.starmap(_jump, ranges)
+    return _run(g, workers, solve)
+
+def connected_components(g, workers: int = None) -> list:
+    return list(component_subgraphs(g, weakly_connected_labels(g, workers)))
+
+def _trim(lo: int, hi: int) -> int:
+    # a vertex without an unassigned neighbour on one side lies on no cycle, it is an SCC by itself
+    # other workers assign vertices meanwhile, which only ever reveals more of these
+    out_offsets, out_targets, in_offsets, in_sources, labels, _ = _arrays
+    trimmed = 0
+    for v in range(lo, hi):
+        if labels[v] != -1:
+            continue
+        for w in out_targets[out_offsets[v]:out_offsets[v + 1]]:
+            if w != v and labels[w] == -1:
+                break
+        else:
+            labels[v] = v
+            trimmed += 1
+            continue
+        for w in in_sources[in_offsets[v]:in_offsets[v + 1]]:
+            if w != v and labels[w] == -1:
+                break
+        else:
+            labels[v] = v
+            trimmed += 1
+    return trimmed
+
+def _unassigned(lo: int, hi: int) -> array:
+    labels = _arrays[LABELS]
+    return array("q", [v for v in range(lo, hi) if labels[v] == -1])
+
+def _reach(start: int, members: set, offsets, neighbours) -> set:
+    seen = {start}
+    stack = [start]
+    while stack:
+        v = stack.pop()
+        for w in neighbours[offsets[v]:offsets[v + 1]]:
+            if w in members and w not in seen:
+                seen.add(w)
+                stack.append(w)
+    return seen
+
+def _forward_backward(vertices: array) -> list:
+    # the SCC of a pivot is what it reaches forward and backward, every other SCC lies entirely in
+    # one of the three remaining parts, large parts are handed back to be spread over the pool
+    out_offsets, out_targets, in_offsets, in_sources, labels, _ = _arrays
+    pending = [set(vertices)]
+    large = []
+    while pending:
+        members = pending.pop()
+        pivot = next(iter(members))
+        forward = _reach(pivot, members, out_offsets, out_targets)
+        backward = _reach(pivot, members, in_offsets, in_sources)
+        component = forward & backward
+        for v in component:
+            labels[v] = pivot
+        for part in (forward - component, backward - component, members - forward - backward):
+            if len(part) >= SPLIT_SIZE:
+                large.append(array("q", part))
+            elif part:
+                pending.append(part)
+    return large
+
+def strongly_connected_labels(g, workers: int = None) -> array:
+    # parallel graph.strongly_connected_labels, the same partition, numbered by first appearance
+    # trimming passes first take out the vertices on no cycle, then forward-backward searches split
+    # the rest, the independent parts of every round are searched by the workers at the same time
+    def solve(pool, n, ranges, block, layout):
+        views = _views(block, layout)
+        views[LABELS][:] = array("q", [-1]) * n
+        for view in views:
+            view.release()
+        remaining = n
+        # a pass trims the next vertex of every chain, stop once passes stop paying off
+        while remaining:
+            trimmed = sum(pool.starmap(_trim, ranges))
+            remaining -= trimmed
+            if trimmed * 100 < n:
+                break
+        rest = array("q")
+        for vertices in pool.starmap(_unassigned, ranges):
+            rest.extend(vertices)
+        tasks = [rest] if rest else []
+        while tasks:
+            tasks = [part for parts in pool.map(_forward_backward, tasks) for part in parts]
+    return _run(g, workers, solve)
+
+def strongly_connected_components(g, workers: int = None) -> list:
+    return list(component_subgraphs(g, strongly_connected_labels(g, workers)))
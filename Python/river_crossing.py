@@ -0,0 +1,141 @@
+from itertools import combinations
+from math import comb
+
+# largest number of boat loads that are precomputed
+_MAX_LOADS = 1 << 12
+
+class RiverCrossing:
+    # generalized river crossing puzzle: a ferryman takes up to capacity items per crossing
+    # and pairs of conflicting items can't be left on a bank without him
+    # a state is the bitmask of the left bank: bit i for items[i] and bit len(items) for the ferryman
+    # we start with everything on the left bank and end with everything on the right bank
+    def __init__(self, items: list, conflicts: list, capacity: int = 1):
+        n = len(items)
+        index = {item: i for i, item in enumerate(items)}
+        # conflict[i] is the mask of the items that can't be left alone with items[i]
+        conflict = [0] * n
+        for item1, item2 in conflicts:
+            conflict[index[item1]] |= 1 << index[item2]
+            conflict[index[item2]] |= 1 << index[item1]
+        # safe[mask] tells if the items in mask can stay on a bank without the ferryman,
+        # built from the mask without its lowest item so every entry costs O(1)
+        safe = bytearray(1 << n)
+        safe[0] = 1
+        for mask in range(1, 1 << n):
+            lowest = mask & -mask
+            rest = mask ^ lowest
+            safe[mask] = safe[rest] and not conflict[lowest.bit_length() - 1] & rest
+        self.items = items
+        self.capacity = capacity
+        self._safe = safe
+        self._ferryman = 1 << n
+        self._all_items = (1 << n) - 1
+        # every load the boat can carry besides the ferryman, the empty load included,
+        # when there are too many of them the loads are enumerated as submasks of the bank instead
+        if sum(comb(n, k) for k in range(min(capacity, n) + 1)) <= _MAX_LOADS:
+            self._loads = [sum(1 << i for i in load) for k in range(min(capacity, n) + 1) for load in combinations(range(n), k)]
+        else:
+            self._loads = None
+        self.start = (1 << (n + 1)) - 1
+        self.goal = 0
+
+    def valid(self, state: int) -> bool:
+        left = state & self._all_items
+        if state & self._ferryman:
+            return bool(self._safe[self._all_items ^ left])
+        return bool(self._safe[left])
+
+    def successors(self, state: int):
+        # the bank the ferryman leaves is unattended after the crossing, the other one is guarded
+        bank = state & self._all_items if state & self._ferryman else self._all_items ^ (state & self._all_items)
+        safe = self._safe
+        moved = state ^ self._ferryman
+        if self._loads is not None:
+            for load in self._loads:
+                if load & bank == load and safe[bank ^ load]:
+                    yield moved ^ load
+            return
+        load = bank
+        while True:
+            if load.bit_count() <= self.capacity and safe[bank ^ load]:
+                yield moved ^ load
+            if load == 0:
+                break
+            load = (load - 1) & bank
+
+    def _bitset_tables(self) -> tuple:
+        # bitsets over all 2^(n+1) states: has_bit[b] holds the states with bit b set
+        # and valid the states where the unattended bank is safe
+        bits = self._ferryman.bit_length()
+        states = 1 << bits
+        everything = (1 << states) - 1
+        size = max(states >> 3, 1)
+        has_bit = []
+        for b in range(bits):
+            # one period is 2^b states without bit b followed by 2^b states with it
+            if b < 3:
+                period = bytes([(0xAA, 0xCC, 0xF0)[b]])
+            else:
+                period = bytes(1 << (b - 3)) + b"\xff" * (1 << (b - 3))
+            has_bit.append(int.from_bytes(period * (size // len(period)), "little") & everything)
+        to_bits = bytes.maketrans(b"\x00\x01", b"01")
+        # bit i of safe_left is safe[i], bit i of safe_right is safe[all_items ^ i]
+        safe_left = int(self._safe[::-1].translate(to_bits), 2)
+        safe_right = int(self._safe.translate(to_bits), 2)
+        valid = safe_left | safe_right << self._ferryman
+        return has_bit, valid
+
+    def _carry(self, layer: int, has_bit: list, from_left: bool) -> int:
+        # moves every boat load at once: for each load the states holding it on the ferryman's bank
+        # are filtered by a mask and shifted to the other bank, loads share their common prefixes
+        result = layer
+        stack = [(layer, 0, 0)]
+        while stack:
+            states, first, loaded = stack.pop()
+            if loaded == self.capacity:
+                continue
+            for b in range(first, self._ferryman.bit_length() - 1):
+                width = 1 << b
+                if from_left:
+                    moved = (states & has_bit[b]) >> width
+                else:
+                    moved = (states & ~has_bit[b]) << width
+                if moved:
+                    result |= moved
+                    stack.append((moved, b + 1, loaded + 1))
+        return result
+
+    def solve(self) -> list:
+        # breadth first search over whole layers of states stored as bitsets, one bit per state
+        # returns the states of a shortest solution or None if the puzzle can't be solved
+        if not self.valid(self.start):
+            return None
+        has_bit, valid = self._bitset_tables()
+        ferry = has_bit[-1]
+        goal = 1 << self.goal
+        layer = visited = 1 << self.start
+        layers = [layer]
+        while layer and not visited & goal:
+            left = self._carry(layer & ferry, has_bit, True) >> self._ferryman
+            right = self._carry(layer & ~ferry, has_bit, False) << self._ferryman
+            layer = (left | right) & valid & ~visited
+            visited |= layer
+            layers.append(layer)
+        if not visited & goal:
+            return None
+        # every valid move can be undone, so the path is rebuilt by stepping back one layer at a time
+        path = [self.goal]
+        for layer in reversed(layers[:-1]):
+            path.append(next(state for state in self.successors(path[-1]) if layer >> state & 1))
+        path.reverse()
+        return path
+
+    def banks(self, state: int) -> tuple:
+        # returns the names on the left and right bank, the ferryman is called "human"
+        left = [item for i, item in enumerate(self.items) if state >> i & 1]
+        right = [item for i, item in enumerate(self.items) if not state >> i & 1]
+        if state & self._ferryman:
+            left.append("human")
+        else:
+            right.append("human")
+        return left, right
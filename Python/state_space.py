@@ -0,0 +1,110 @@
+from collections import deque
+from heapq import heappop, heappush
+from itertools import count
+
+# searches over implicit graphs: states are any hashable values and
+# successors(state) generates the neighbouring states lazily, so the graph is never built
+
+def _walk_back(previous: dict, state) -> list:
+    # rebuilds the path ending in state from a predecessor dict
+    path = []
+    while state is not None:
+        path.append(state)
+        state = previous[state]
+    path.reverse()
+    return path
+
+def bfs(start, goal, successors) -> list:
+    # returns a shortest path of states from start to goal or None if goal can't be reached
+    previous = {start: None}
+    queue = deque([start])
+    while queue:
+        state = queue.popleft()
+        if state == goal:
+            return _walk_back(previous, goal)
+        for neighbour in successors(state):
+            if neighbour not in previous:
+                previous[neighbour] = state
+                queue.append(neighbour)
+    return None
+
+def bidirectional_bfs(start, goal, successors, predecessors = None) -> list:
+    # searches from both ends at once, always expanding a whole layer of the smaller frontier
+    # predecessors(state) generates the states with a move into state, by default moves are reversible
+    # returns a shortest path of states from start to goal or None if goal can't be reached
+    if predecessors is None:
+        predecessors = successors
+    if start == goal:
+        return [start]
+    forward = {start: None}
+    backward = {goal: None}
+    forward_distance = {start: 0}
+    backward_distance = {goal: 0}
+    forward_layer = [start]
+    backward_layer = [goal]
+    while forward_layer and backward_layer:
+        if len(forward_layer) <= len(backward_layer):
+            layer, parents, distance, other, expand = forward_layer, forward, forward_distance, backward_distance, successors
+        else:
+            layer, parents, distance, other, expand = backward_layer, backward, backward_distance, forward_distance, predecessors
+        best = None
+        meeting = None
+        next_layer = []
+        for state in layer:
+            for neighbour in expand(state):
+                if neighbour not in parents:
+                    parents[neighbour] = state
+                    distance[neighbour] = distance[state] + 1
+                    next_layer.append(neighbour)
+                if neighbour in other:
+                    length = distance[state] + 1 + other[neighbour]
+                    if best is None or length < best:
+                        best = length
+                        meeting = (state, neighbour)
+        if meeting is not None:
+            state, neighbour = meeting
+            # the meeting edge may not be the one recorded in parents, so both halves are rebuilt around it
+            if parents is forward:
+                head = _walk_back(forward, state)
+                tail = _walk_back(backward, neighbour)
+            else:
+                head = _walk_back(forward, neighbour)
+                tail = _walk_back(backward, state)
+            tail.reverse()
+            return head + tail
+        if parents is forward:
+            forward_layer = next_layer
+        else:
+            backward_layer = next_layer
+    return None
+
+def astar(start, goal, successors, heuristic = None, cost = None) -> tuple:
+    # A* search, cost(state, neighbour) is the cost of a move (1 by default)
+    # heuristic(state) must never overestimate the remaining cost to goal (0 by default, which is Dijkstra)
+    # returns (cost, path) of a cheapest path from start to goal or None if goal can't be reached
+    if heuristic is None:
+        heuristic = lambda state: 0
+    if cost is None:
+        cost = lambda state, neighbour: 1
+    previous = {start: None}
+    distance = {start: 0}
+    closed = set()
+    # the counter breaks ties so states never have to be compared
+    tie = count()
+    heap = [(heuristic(start), next(tie), start)]
+    while heap:
+        _, _, state = heappop(heap)
+        if state in closed:
+            continue
+        if state == goal:
+            return distance[goal], _walk_back(previous, goal)
+        closed.add(state)
+        for neighbour in successors(state):
+            d = distance[state] + cost(state, neighbour)
+            if neighbour not in distance or d < distance[neighbour]:
+                # with an inconsistent heuristic a closed state can still get cheaper, it is searched again
+                closed.discard(neighbour)
+                distance[neighbour] = d
+                previous[neighbour] = state
+                heappush(heap, (d + heuristic(neighbour), next(tie), neighbour))
+    return None
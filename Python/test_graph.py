@@ -0,0 +1,577 @@
+import math
+import pytest
+import graph
+from random import Random
+from graph import DirectedGraph, GraphError, SubgraphView, accessible, strongly_connected_components, shortest_walk, all_pairs_shortest_paths, random_graph, strongly_connected_labels, biconnected_decomposition, biconnected_components, weakly_connected_labels, connected_components, read_graph_from_file, save_binary, load_binary, write_graph_to_file, erdos_renyi_graph, scale_free_graph, grid_graph, reachability, batch_shortest_paths, single_source_shortest_paths, IncrementalSCC, condensation, minimum_spanning_forest, CycleError, topological_sort, schedule, max_flow
+
+def test_graph():
+    g = DirectedGraph(5)
+    assert g.vertice_count() == 5
+    assert g.add_edge(0, 1, 10)
+    assert g.add_edge(1, 2, 20)
+    assert g.add_edge(2, 3, 30)
+    assert g.add_edge(3, 4, 40)
+    assert not g.add_edge(0, 1, 50) # edge already exists
+    assert g.get_cost(0, 1) == 10
+    g.modify_cost(0, 1, 15)
+    assert g.get_cost(0, 1) == 15
+    assert g.in_degree(1) == 1
+    assert g.out_degree(1) == 1
+    assert g.is_edge(0, 1)
+    assert not g.is_edge(1, 0)
+    assert g.remove_edge(0, 1)
+    assert not g.is_edge(0, 1)
+    assert g.add_vertex(5)
+    assert g.add_edge(5, 0, 25)
+    assert g.get_cost(5, 0) == 25
+    assert g.remove_vertex(5)
+    assert not g.is_edge(5, 0)
+    assert g.remove_edge(1, 2)
+    assert not g.is_edge(1, 2)
+
+def test_freeze():
+    g = DirectedGraph([3, 7, 1, 9])
+    g.add_edge(3, 7, 5)
+    g.add_edge(7, 1, -2)
+    g.add_edge(1, 3, 4)
+    g.add_edge(3, 9, 8)
+    frozen = g.freeze()
+    assert list(frozen.vertices()) == [3, 7, 1, 9]
+    assert frozen.vertice_count() == 4
+    assert frozen.edge_count() == 4
+    assert sorted(frozen.outbound(3)) == [7, 9]
+    assert list(frozen.inbound(3)) == [1]
+    assert frozen.get_cost(7, 1) == -2
+    assert frozen.in_degree(9) == 1
+    assert frozen.out_degree(9) == 0
+    assert frozen.is_edge(1, 3)
+    assert not frozen.is_edge(3, 1)
+    assert not frozen.is_edge(3, 42)
+    with pytest.raises(GraphError):
+        frozen.get_cost(9, 3)
+    assert accessible(frozen, 9) == {9}
+    assert accessible(frozen, 7) == {3, 7, 1, 9}
+    components = strongly_connected_components(frozen)
+    assert sorted(sorted(c.vertices()) for c in components) == [[1, 3, 7], [9]]
+    thawed = frozen.thaw()
+    assert thawed.edge_count() == 4
+    assert thawed.get_cost(3, 9) == 8
+
+def test_shortest_walk():
+    g = DirectedGraph(5)
+    g.add_edge(0, 1, 4)
+    g.add_edge(0, 2, 1)
+    g.add_edge(2, 1, 2)
+    g.add_edge(1, 3, 5)
+    assert shortest_walk(g, 0, 3) == (8, [0, 2, 1, 3])
+    assert shortest_walk(g, 2, 2) == (0, [2])
+    with pytest.raises(GraphError):
+        shortest_walk(g, 0, 4)
+    # negative costs switch to Bellman-Ford
+    g.add_edge(0, 3, 1)
+    g.add_edge(3, 4, -10)
+    assert shortest_walk(g, 0, 4) == (-9, [0, 3, 4])
+    assert shortest_walk(g.freeze(), 0, 4) == (-9, [0, 3, 4])
+    g.add_edge(4, 0, 2)
+    with pytest.raises(GraphError):
+        shortest_walk(g, 0, 4)
+
+def test_shortest_path_cache():
+    g = DirectedGraph(4)
+    g.add_edges([(0, 1, 5), (1, 2, 5), (0, 2, 20)])
+    cache = g.shortest_path_cache()
+    cache.capacity = 2
+    assert shortest_walk(g, 0, 2) == (10, [0, 1, 2])
+    assert shortest_walk(g, 0, 1) == (5, [0, 1])
+    assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 0, "invalidations": 0, "size": 1}
+    # adding a vertex can't change a shortest path, every other mutation drops the cached trees
+    g.add_vertex(4)
+    assert shortest_walk(g, 0, 2) == (10, [0, 1, 2])
+    assert cache.hits == 2
+    for mutate in (lambda: g.modify_cost(0, 2, 1), lambda: g.add_edge(2, 3, 1), lambda: g.remove_edge(0, 2),
+                   lambda: g.add_edges([(0, 3, 1)]), lambda: g.remove_edges([(0, 3)]), lambda: g.remove_vertex(4)):
+        mutate()
+        expected = single_source_shortest_paths(g, 0)[0][2]
+        assert shortest_walk(g, 0, 2)[0] == expected
+    assert cache.invalidations == 6
+    assert shortest_walk(g, 0, 3) == (11, [0, 1, 2, 3])
+    shortest_walk(g, 1, 2)
+    shortest_walk(g, 2, 3)
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["size"] == 2
+    # copies start with their own cache
+    assert g.copy_graph().shortest_path_cache() is not cache
+
+def test_batch_queries():
+    g = random_graph(40, 120, seed=3, cost_range=(0, 20))
+    order = list(g.vertices())
+    sources = [0, 5, 5, 17, 39]
+    rows = reachability(g, sources)
+    assert len(rows) == len(sources)
+    for source, row in zip(sources, rows):
+        assert {order[i] for i, reached in enumerate(row) if reached} == accessible(g, source)
+    rows[1][0] ^= 1
+    assert rows[2] != rows[1]
+    pairs = [(u, v) for u in (0, 5, 17) for v in range(0, 40, 3)] + [(5, 5)]
+    costs = batch_shortest_paths(g, pairs)
+    for (u, v), cost in zip(pairs, costs):
+        dist, _ = single_source_shortest_paths(g, u)
+        assert cost == dist.get(v, math.inf)
+    g.add_vertex(40)
+    assert batch_shortest_paths(g, [(0, 40)])[0] == math.inf
+    assert reachability(g, [40])[0].count(1) == 1
+    with pytest.raises(GraphError):
+        reachability(g, [41])
+
+def test_all_pairs_shortest_paths():
+    g = DirectedGraph(4)
+    g.add_edge(0, 1, 3)
+    g.add_edge(1, 2, -2)
+    g.add_edge(0, 2, 4)
+    g.add_edge(2, 0, 5)
+    for method in ("johnson", "floyd"):
+        result = all_pairs_shortest_paths(g, method)
+        assert result.distance(0, 2) == 1
+        assert result.path(0, 2) == [0, 1, 2]
+        assert result.distance(1, 0) == 3
+        assert result.distance(3, 3) == 0
+        assert result.distance(0, 3) == float("inf")
+    g = random_graph(15, 60, seed=6)
+    for vertex in g.vertices():
+        if g.is_edge(vertex, vertex):
+            g.remove_edge(vertex, vertex)
+    for vertex1, vertex2, cost in list(g.edges()):
+        g.modify_cost(vertex1, vertex2, abs(cost))
+    johnson = all_pairs_shortest_paths(g, "johnson")
+    floyd = all_pairs_shortest_paths(g, "floyd")
+    for u in g.vertices():
+        for v in g.vertices():
+            assert johnson.distance(u, v) == floyd.distance(u, v)
+            if johnson.distance(u, v) != float("inf"):
+                assert shortest_walk(g, u, v)[0] == johnson.distance(u, v)
+
+def test_strongly_connected_labels():
+    g = DirectedGraph(6)
+    for vertex1, vertex2 in ((0, 1), (1, 2), (2, 0), (2, 3), (3, 4), (4, 3), (4, 5)):
+        g.add_edge(vertex1, vertex2, 1)
+    labels = strongly_connected_labels(g)
+    assert labels[0] == labels[1] == labels[2]
+    assert labels[3] == labels[4]
+    assert len(set(labels)) == 3
+    # components are completed sinks first
+    assert labels[5] < labels[3] < labels[0]
+    components = strongly_connected_components(g)
+    assert [sorted(c.vertices()) for c in components] == [[5], [3, 4], [0, 1, 2]]
+    assert components[1].edge_count() == 2
+    assert components[2].get_cost(2, 0) == 1
+
+def test_strongly_connected_labels_deep():
+    n = 10000
+    g = DirectedGraph(n)
+    for vertex in range(n - 1):
+        g.add_edge(vertex, vertex + 1, 1)
+    assert len(set(strongly_connected_labels(g))) == n
+    g.add_edge(n - 1, 0, 1)
+    assert set(strongly_connected_labels(g)) == {0}
+
+def undirected_graph(vertices: int, edges: list) -> DirectedGraph:
+    g = DirectedGraph(vertices)
+    for vertex1, vertex2 in edges:
+        g.add_edge(vertex1, vertex2, 1)
+        g.add_edge(vertex2, vertex1, 1)
+    return g
+
+def test_condensation():
+    g = DirectedGraph(7)
+    # {0, 1, 2} is a cycle, 3 and 4 hang off it, 5 has a self loop, 6 is isolated
+    g.add_edges([(0, 1, 1), (1, 2, 1), (2, 0, 1), (2, 3, 4), (1, 3, 7), (0, 4, -2), (4, 3, 1), (3, 5, 2), (5, 5, 1)])
+    c = condensation(g)
+    assert c.component_count() == 5
+    assert c.component(0) == c.component(1) == c.component(2)
+    assert not c.is_acyclic()
+    order = c.topological_order()
+    assert sorted(order) == list(range(7))
+    assert all(c.component(v1) <= c.component(v2) for v1, v2, _ in g.edges())
+    a = c.component(0)
+    assert c.min_cost[a][c.component(3)] == 4
+    assert c.max_cost[a][c.component(3)] == 7
+    assert c.reaches(1, 5) and c.reaches(4, 3) and not c.reaches(3, 0) and not c.reaches(0, 6)
+    dist = c.shortest_paths(1)
+    assert dist[c.component(3)] == -1 and dist[c.component(5)] == 1 and dist[c.component(6)] == math.inf
+    longest = c.longest_paths(1)
+    assert longest[c.component(3)] == 7 and longest[c.component(6)] == -math.inf
+    # 0 -> 3 is implied by 0 -> 4 -> 3
+    assert (a, c.component(3)) not in c.transitive_reduction()
+    assert len(c.transitive_reduction()) == 3
+    frozen = c.freeze()
+    assert frozen.edge_count() == 4 and frozen.get_cost(a, c.component(4)) == -2
+    # on a DAG the walks of the condensation are the walks of the graph
+    rng = Random(5)
+    dag = DirectedGraph(60)
+    dag.add_edges((u, v, rng.randint(-20, 20)) for u, v in ((rng.randrange(60), rng.randrange(60)) for _ in range(200)) if u < v)
+    c = condensation(dag)
+    assert c.is_acyclic()
+    for source in range(0, 60, 7):
+        expected, _ = single_source_shortest_paths(dag, source)
+        dist = c.shortest_paths(source)
+        for vertex in range(60):
+            assert dist[c.component(vertex)] == expected.get(vertex, math.inf)
+            assert c.reaches(source, vertex) == (vertex in expected)
+
+def test_incremental_scc():
+    def partition(g):
+        return sorted(sorted(component.vertices()) for component in strongly_connected_components(g))
+    g = random_graph(30, 25, seed=7)
+    inc = IncrementalSCC(g)
+    rng = Random(7)
+    for _ in range(400):
+        u = rng.randrange(31)
+        v = rng.randrange(31)
+        action = rng.random()
+        if action < 0.6:
+            if g.is_vertex(u) and g.is_vertex(v):
+                inc.add_edge(u, v, 1)
+        elif action < 0.85:
+            inc.remove_edge(u, v)
+        elif action < 0.93:
+            inc.remove_vertex(u)
+        else:
+            inc.add_vertex(u)
+        assert sorted(sorted(component.vertices()) for component in inc.components()) == partition(g)
+        assert inc.component_count() == len(partition(g))
+        if g.is_vertex(u) and g.is_vertex(v):
+            assert inc.reaches(u, v) == (v in accessible(g, u))
+            assert inc.same_component(u, v) == (inc.reaches(u, v) and inc.reaches(v, u))
+    # the condensation counts every edge between two components
+    between = sum(inc.component(v1) != inc.component(v2) for v1, v2, _ in g.edges())
+    assert sum(sum(out.values()) for out in inc.dag.values()) == between
+    # components() is in topological order
+    position = {}
+    for i, component in enumerate(inc.components()):
+        for vertex in component.vertices():
+            position[vertex] = i
+    assert all(position[v1] <= position[v2] for v1, v2, _ in g.edges())
+    with pytest.raises(GraphError):
+        inc.component(99)
+
+def test_incremental_scc_split(monkeypatch):
+    # breaking a cycle splits it in place, also once the room between positions runs out
+    for room in (1, 2, 1 << 32):
+        monkeypatch.setattr(graph, "_SCC_ROOM", room)
+        g = DirectedGraph(12)
+        for v in range(10):
+            g.add_edge(v, (v + 1) % 10, 1)
+        g.add_edge(10, 0, 1)
+        g.add_edge(5, 11, 1)
+        inc = IncrementalSCC(g)
+        assert inc.component_count() == 3
+        inc.remove_edge(9, 0)
+        inc.remove_edge(3, 4)
+        order = [list(component.vertices()) for component in inc.components()]
+        assert len(order) == 12
+        position = {vertices[0]: i for i, vertices in enumerate(order)}
+        assert all(position[v1] < position[v2] for v1, v2, _ in g.edges())
+
+def test_biconnected_decomposition():
+    # two triangles sharing vertex 2, a bridge 4 - 5 and an isolated vertex 6
+    g = undirected_graph(7, [(0, 1), (1, 2), (2, 0), (2, 3), (3, 4), (4, 2), (4, 5)])
+    blocks, articulation_points, bridges = biconnected_decomposition(g)
+    assert sorted(sorted({v for edge in block for v in edge}) for block in blocks) == [[0, 1, 2], [2, 3, 4], [4, 5]]
+    assert sum(len(block) for block in blocks) == 7
+    assert articulation_points == {2, 4}
+    assert [tuple(sorted(edge)) for edge in bridges] == [(4, 5)]
+    components = biconnected_components(g)
+    assert len(components) == 4
+    assert sorted(c.edge_count() for c in components) == [0, 2, 6, 6]
+    # a long path has every inner vertex as articulation point and every edge as bridge
+    n = 10000
+    g = undirected_graph(n, [(vertex, vertex + 1) for vertex in range(n - 1)])
+    blocks, articulation_points, bridges = biconnected_decomposition(g)
+    assert len(blocks) == n - 1
+    assert len(bridges) == n - 1
+    assert articulation_points == set(range(1, n - 1))
+
+def test_connected_components():
+    g = DirectedGraph(6)
+    g.add_edge(0, 1, 1)
+    g.add_edge(2, 1, 2)
+    g.add_edge(3, 4, 3)
+    assert list(weakly_connected_labels(g)) == [0, 0, 0, 1, 1, 2]
+    components = connected_components(g)
+    assert [sorted(c.vertices()) for c in components] == [[0, 1, 2], [3, 4], [5]]
+    assert components[0].get_cost(2, 1) == 2
+    steps = []
+    assert accessible(g, 0, lambda node, stack, acc: steps.append(list(stack))) == {0, 1}
+    assert steps == [[0, 1], [0], []]
+
+def test_topological_sort():
+    g = DirectedGraph(60)
+    rng = Random(2)
+    g.add_edges((u, v, 1) for u, v in ((rng.randrange(60), rng.randrange(60)) for _ in range(200)) if u < v)
+    order = topological_sort(g)
+    position = {vertex: i for i, vertex in enumerate(order)}
+    assert sorted(order) == list(range(60))
+    assert all(position[v1] < position[v2] for v1, v2, _ in g.edges())
+    vertex1, vertex2, _ = next(g.edges())
+    g.add_edge(vertex2, vertex1, 1)
+    with pytest.raises(CycleError) as info:
+        topological_sort(g)
+    assert info.value.component.is_vertex(vertex1) and info.value.component.is_vertex(vertex2)
+    g = DirectedGraph(3)
+    g.add_edge(0, 1, 1)
+    g.add_edge(2, 2, 1)
+    with pytest.raises(CycleError) as info:
+        topological_sort(g)
+    assert list(info.value.component.vertices()) == [2]
+
+def test_schedule():
+    # edge costs are the durations of their first vertex, 5 is the end of the project
+    g = DirectedGraph(6)
+    g.add_edges([(0, 1, 3), (0, 2, 3), (1, 3, 2), (2, 3, 4), (2, 4, 4), (3, 5, 1), (4, 5, 2)])
+    plan = schedule(g)
+    assert plan.makespan == 9
+    assert [plan.earliest_start(v) for v in range(6)] == [0, 3, 3, 7, 7, 9]
+    assert [plan.latest_start(v) for v in range(6)] == [0, 6, 3, 8, 7, 9]
+    assert [plan.slack(v) for v in range(6)] == [0, 3, 0, 1, 0, 0]
+    assert plan.critical_path() == [0, 2, 4, 5]
+    assert all(plan.slack(v) == 0 for v in plan.critical_path())
+    assert schedule(DirectedGraph()).critical_path() == []
+    g.add_edge(5, 0, 1)
+    with pytest.raises(CycleError) as info:
+        schedule(g)
+    assert info.value.component.vertice_count() == 6
+
+def test_max_flow():
+    g = DirectedGraph(6)
+    g.add_edges([(0, 1, 10), (0, 2, 10), (1, 2, 2), (1, 3, 4), (1, 4, 8), (2, 4, 9), (4, 3, 6), (3, 5, 10), (4, 5, 10),
+                 (5, 0, 3), (2, 2, 5)])
+    for algorithm in ("dinic", "push_relabel"):
+        flow = max_flow(g, 0, 5, algorithm)
+        assert flow.value == 19
+        assert sum(g.get_cost(vertex1, vertex2) for vertex1, vertex2 in flow.cut) == 19
+        assert 0 in flow.source_side and 5 in flow.sink_side
+        assert flow.source_side | flow.sink_side == set(range(6))
+        for (vertex1, vertex2), amount in flow.flow.items():
+            assert 0 <= amount <= g.get_cost(vertex1, vertex2)
+        for vertex in range(1, 5):
+            assert sum(flow.flow[node, vertex] for node in g.inbound(vertex)) == sum(flow.flow[vertex, out] for out in g.outbound(vertex))
+        assert flow.flow[5, 0] == 0 and flow.flow[2, 2] == 0
+    # the graph itself is left alone
+    assert g.get_cost(0, 1) == 10
+    for vertices, edges in ((30, 150), (60, 600)):
+        g = random_graph(vertices, edges, seed=edges, cost_range=(0, 20))
+        assert max_flow(g, 0, vertices - 1).value == max_flow(g, 0, vertices - 1, "push_relabel").value
+    g.add_vertex(100)
+    assert max_flow(g, 0, 100).value == 0
+    g.modify_cost(*next(g.edges())[:2], -1)
+    for source, sink, algorithm in ((0, 100, "dinic"), (0, 0, "dinic"), (0, 101, "dinic"), (0, 1, "simplex")):
+        with pytest.raises(GraphError):
+            max_flow(g, source, sink, algorithm)
+
+def test_minimum_spanning_forest():
+    g = DirectedGraph(6)
+    # two triangles, one given in both directions like read_graph_from_file does, and a self loop
+    g.add_edges([(0, 1, 4), (1, 0, 4), (1, 2, 1), (2, 1, 1), (0, 2, 2), (2, 0, 2), (3, 4, -1), (5, 4, 3), (3, 5, 7), (5, 5, -9)])
+    for algorithm in ("kruskal", "prim", "auto"):
+        edges, total = minimum_spanning_forest(g, algorithm)
+        assert total == 5
+        assert len(edges) == 4
+        assert all(g.get_cost(vertex1, vertex2) == cost for vertex1, vertex2, cost in edges)
+        assert sorted(cost for _, _, cost in edges) == [-1, 1, 2, 3]
+    for vertices, edges in ((50, 40), (50, 300), (30, 800)):
+        g = random_graph(vertices, edges, seed=edges)
+        forest, total = minimum_spanning_forest(g, "kruskal")
+        assert minimum_spanning_forest(g, "prim")[1] == total
+        assert len(forest) == vertices - len(connected_components(g))
+    with pytest.raises(GraphError):
+        minimum_spanning_forest(g, "boruvka")
+
+def test_read_graph_from_file(tmp_path):
+    filename = tmp_path / "graph.txt"
+    filename.write_text("nodelist\n4 8 15 16\n4 8 1\n\n8 15 2\n15 8 3\n16 4 -4\n")
+    reports = []
+    g = read_graph_from_file(str(filename), chunk_size=8, progress=lambda done, total: reports.append((done, total)))
+    assert list(g.vertices()) == [4, 8, 15, 16]
+    assert g.edge_count() == 6
+    assert g.get_cost(8, 4) == 1
+    # the reversed edge from the second line wins over the third line
+    assert g.get_cost(15, 8) == 2
+    assert g.get_cost(4, 16) == -4
+    assert len(reports) > 1
+    assert reports[-1][0] == reports[-1][1]
+    g = read_graph_from_file(str(filename), undirected=False)
+    assert g.edge_count() == 4
+    assert g.get_cost(15, 8) == 3
+    # a short line is rejected even when a long one makes up for its values
+    for text in ("3 1\n0 1\n", "6 2\n0 1\n2 3 5 1\n"):
+        filename.write_text(text)
+        with pytest.raises(GraphError):
+            read_graph_from_file(str(filename))
+
+def test_binary_format(tmp_path):
+    g = DirectedGraph([5, 3, 9])
+    g.add_edge(5, 9, -1)
+    g.add_edge(9, 3, 7)
+    g.add_edge(3, 5, 2)
+    for graph in (g, DirectedGraph(4)):
+        filename = str(tmp_path / "graph.bin")
+        save_binary(filename, graph)
+        loaded = load_binary(filename)
+        assert list(loaded.vertices()) == list(graph.vertices())
+        assert sorted(loaded.edges()) == sorted(graph.edges())
+    assert loaded.vertice_count() == 4
+    loaded = load_binary(str(tmp_path / "graph.bin"))
+    with pytest.raises(GraphError):
+        loaded.add_edge(0, 1, 1)
+    with pytest.raises(GraphError):
+        load_binary("graph1.txt")
+    # saving over a loaded file leaves the loaded graph intact
+    filename = str(tmp_path / "graph.bin")
+    save_binary(filename, g)
+    loaded = load_binary(filename)
+    save_binary(filename, DirectedGraph(2))
+    assert sorted(loaded.edges()) == sorted(g.edges())
+    assert accessible(loaded, 5) == {5, 9, 3}
+    assert load_binary(filename).vertice_count() == 2
+    # offsets out of range are caught when loading
+    save_binary(filename, DirectedGraph(3))
+    with open(filename, "r+b") as f:
+        f.seek(32 + 8)
+        f.write((5).to_bytes(8, "little"))
+    with pytest.raises(GraphError):
+        load_binary(filename)
+    # values outside int64 are reported instead of raising OverflowError
+    g.add_edge(5, 3, 10 ** 20)
+    big = DirectedGraph([10 ** 20])
+    for graph in (g, big):
+        with pytest.raises(GraphError):
+            save_binary(str(tmp_path / "big.bin"), graph)
+
+def test_write_graph_to_file(tmp_path):
+    g = DirectedGraph([2, 0, 1])
+    g.add_edge(2, 0, 5)
+    g.add_edge(0, 1, -3)
+    filename = str(tmp_path / "graph.txt")
+    write_graph_to_file(filename, g, chunk_size=1)
+    with open(filename) as f:
+        assert f.read() == "3 2\n2 0 5\n0 1 -3\n"
+    g.add_vertex(7)
+    for name in ("graph.txt", "graph.txt.gz", "graph.txt.bz2", "graph.txt.xz"):
+        filename = str(tmp_path / name)
+        write_graph_to_file(filename, g)
+        loaded = read_graph_from_file(filename, undirected=False)
+        assert list(loaded.vertices()) == [2, 0, 1, 7]
+        assert sorted(loaded.edges()) == sorted(g.edges())
+    with open(str(tmp_path / "graph.txt")) as f:
+        assert f.readline() == "nodelist\n"
+
+def test_random_generators():
+    g = random_graph(10, 100, seed=1)
+    assert g.edge_count() == 100
+    assert sorted(g.edges()) == sorted(random_graph(10, 100, seed=1, frozen=True).edges())
+    assert sorted(random_graph(50, 300, seed=2).edges()) != sorted(random_graph(50, 300, seed=3).edges())
+    assert all(-100 <= cost <= 100 for _, _, cost in g.edges())
+    g = erdos_renyi_graph(30, 1, seed=4)
+    assert g.edge_count() == 30 * 29
+    g = erdos_renyi_graph(200, 0.05, seed=5)
+    assert 1500 < g.edge_count() < 2500
+    assert not any(vertex1 == vertex2 for vertex1, vertex2, _ in g.edges())
+    assert erdos_renyi_graph(20, 0, seed=6).edge_count() == 0
+    assert erdos_renyi_graph(1000, 1e-17, seed=6).edge_count() == 0
+    assert erdos_renyi_graph(1000, 5e-324, seed=6).edge_count() == 0
+    g = scale_free_graph(100, 3, seed=7)
+    assert g.edge_count() == 97 * 3
+    assert all(g.out_degree(vertex) == 3 for vertex in range(3, 100))
+    g = grid_graph(3, 4, seed=8, frozen=True, cost_range=(1, 9))
+    assert g.edge_count() == 2 * (3 * 3 + 2 * 4)
+    assert g.get_cost(5, 6) == g.get_cost(6, 5)
+    assert all(1 <= cost <= 9 for _, _, cost in g.edges())
+
+def test_copy_graph():
+    g = DirectedGraph(4)
+    g.add_edge(0, 1, 1)
+    g.add_edge(1, 2, 2)
+    g.add_edge(2, 2, 3)
+    copy = g.copy_graph()
+    copy.add_edge(0, 2, 4)
+    copy.modify_cost(1, 2, 20)
+    copy.remove_edge(0, 1)
+    assert not g.is_edge(0, 2)
+    assert g.get_cost(1, 2) == 2
+    assert g.is_edge(0, 1)
+    assert list(g.inbound(2)) == [1, 2]
+    assert copy.edge_count() == 3
+    assert g.edge_count() == 3
+    g.remove_vertex(2)
+    assert g.edge_count() == 1
+    assert copy.is_edge(2, 2)
+    assert sorted(copy.inbound(2)) == [0, 1, 2]
+    # copies of copies stay isolated in both directions
+    copy2 = copy.copy_graph()
+    copy2.add_vertex(9)
+    copy2.add_edge(9, 0, 5)
+    copy.add_edge(3, 0, 6)
+    assert not copy.is_vertex(9)
+    assert list(copy2.inbound(0)) == [9]
+    assert list(copy.inbound(0)) == [3]
+    assert list(g.inbound(0)) == []
+    assert sorted(g.edges()) == [(0, 1, 1)]
+
+def test_subgraph_view():
+    g = DirectedGraph(4)
+    g.add_edge(0, 1, 1)
+    g.add_edge(1, 0, 2)
+    g.add_edge(1, 2, 3)
+    g.add_edge(3, 0, 4)
+    view = SubgraphView(g, [1, 0, 2])
+    assert list(view.vertices()) == [1, 0, 2]
+    assert view.edge_count() == 3
+    assert list(view.inbound(0)) == [1]
+    assert view.in_degree(0) == 1
+    assert view.out_degree(1) == 2
+    assert view.get_cost(1, 2) == 3
+    assert not view.is_edge(3, 0)
+    with pytest.raises(GraphError):
+        view.outbound(3)
+    with pytest.raises(GraphError):
+        view.add_edge(2, 0, 1)
+    # the view follows the parent, the materialized copy doesn't
+    copy = view.materialize()
+    g.add_edge(2, 0, 5)
+    assert view.is_edge(2, 0)
+    assert not copy.is_edge(2, 0)
+    copy.add_edge(2, 1, 6)
+    assert not g.is_edge(2, 1)
+    assert copy.edge_count() == 4
+    # vertices removed from the parent drop out of the view
+    g.remove_vertex(0)
+    assert list(view.vertices()) == [1, 2]
+    assert view.vertice_count() == 2
+    assert not view.is_vertex(0)
+    assert list(view.edges()) == [(1, 2, 3)]
+    with pytest.raises(GraphError):
+        view.outbound(0)
+    assert view.materialize().vertice_count() == 2
+
+def test_batch_mutations():
+    g = DirectedGraph()
+    assert g.add_vertices([0, 1, 2, 1]) == 3
+    assert g.add_edges([(0, 1, 5), (1, 2, 6), (0, 1, 7)]) == (2, 1)
+    assert g.get_cost(0, 1) == 5
+    assert g.add_edges(iter([(1, 2, 8), (2, 0, 9)])) == (1, 1)
+    with pytest.raises(GraphError):
+        g.add_edges([(2, 1, 1), (0, 3, 1)])
+    # a rejected batch inserts nothing
+    assert not g.is_edge(2, 1)
+    assert g.edge_count() == 3
+    with pytest.raises(GraphError):
+        g.add_edges([(2, 1, 5), (1, 0)])
+    assert not g.is_edge(2, 1)
+    assert g.edge_count() == 3
+    assert g.remove_edges([(0, 1), (1, 0), (2, 0, 9)]) == (2, 1)
+    assert sorted(g.edges()) == [(1, 2, 6)]
+    copy = g.copy_graph()
+    copy.add_edges([(0, 2, 1), (2, 1, 2)])
+    assert g.edge_count() == 1
+    assert list(g.inbound(2)) == [1]
+    assert list(copy.inbound(2)) == [1, 0]
@@ -0,0 +1,29 @@
+import parallel
+from graph import DirectedGraph, random_graph, weakly_connected_labels, strongly_connected_labels
+
+def partition(g, labels) -> list:
+    members = {}
+    for vertex, label in zip(g.vertices(), labels):
+        members.setdefault(label, []).append(vertex)
+    return sorted(members.values())
+
+def test_weakly_connected_labels():
+    for vertices, edges in ((300, 200), (300, 600)):
+        g = random_graph(vertices, edges, seed=vertices + edges)
+        assert parallel.weakly_connected_labels(g, 2) == weakly_connected_labels(g)
+        assert parallel.weakly_connected_labels(g.freeze(), 3) == weakly_connected_labels(g)
+    assert len(parallel.connected_components(DirectedGraph(4), 2)) == 4
+
+def test_strongly_connected_labels(monkeypatch):
+    # small enough parts that the forward-backward rounds are spread over the pool
+    monkeypatch.setattr(parallel, "SPLIT_SIZE", 8)
+    for vertices, edges in ((300, 250), (300, 450), (300, 900)):
+        g = random_graph(vertices, edges, seed=vertices + edges)
+        expected = partition(g, strongly_connected_labels(g))
+        assert partition(g, parallel.strongly_connected_labels(g, 2)) == expected
+        assert partition(g, parallel.strongly_connected_labels(g.freeze(), 3)) == expected
+    g = DirectedGraph(3)
+    g.add_edge(0, 0, 1)
+    g.add_edge(1, 2, 1)
+    g.add_edge(2, 1, 1)
+    assert sorted(sorted(c.vertices()) for c in parallel.strongly_connected_components(g, 2)) == [[0], [1, 2]]
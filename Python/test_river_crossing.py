@@ -0,0 +1,36 @@
+from random import Random
+import river_crossing
+from river_crossing import RiverCrossing
+from state_space import bfs
+from wolf_goat_cabbage import successors
+
+def test_wolf_goat_cabbage():
+    puzzle = RiverCrossing(["wolf", "goat", "cabbage"], [("wolf", "goat"), ("goat", "cabbage")])
+    # same bit layout as wolf_goat_cabbage.py
+    assert sorted(puzzle.successors(0b1111)) == sorted(successors(0b1111))
+    path = puzzle.solve()
+    assert len(path) - 1 == 7
+    assert puzzle.banks(path[1]) == (["wolf", "cabbage"], ["goat", "human"])
+    assert all(puzzle.valid(state) for state in path)
+
+def test_unsolvable():
+    # the boat can't take anyone away from a triangle of conflicts safely
+    puzzle = RiverCrossing(["a", "b", "c"], [("a", "b"), ("b", "c"), ("a", "c")])
+    assert puzzle.solve() is None
+    puzzle = RiverCrossing(["a", "b", "c"], [("a", "b"), ("b", "c"), ("a", "c")], capacity=2)
+    assert len(puzzle.solve()) - 1 == 3
+
+def test_matches_generic_bfs(monkeypatch):
+    rng = Random(1)
+    # also enumerate the boat loads as submasks of the bank
+    monkeypatch.setattr(river_crossing, "_MAX_LOADS", 16)
+    for _ in range(20):
+        items = list(range(rng.randint(2, 7)))
+        conflicts = [(a, b) for a in items for b in items if a < b and rng.random() < 0.2]
+        for capacity in (1, 2, len(items)):
+            puzzle = RiverCrossing(items, conflicts, capacity)
+            expected = bfs(puzzle.start, puzzle.goal, puzzle.successors)
+            path = puzzle.solve()
+            assert (path is None) == (expected is None)
+            if path is not None:
+                assert len(path) == len(expected)
@@ -0,0 +1,50 @@
+from state_space import astar, bfs, bidirectional_bfs
+from wolf_goat_cabbage import items_left, successors
+
+def grid_successors(state):
+    # 4-neighbourhood on a 20 x 20 grid with a wall at x == 10 open only at y == 19
+    x, y = state
+    for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+        if 0 <= nx < 20 and 0 <= ny < 20 and (nx != 10 or ny == 19):
+            yield nx, ny
+
+def test_wolf_goat_cabbage():
+    path = bfs(0b1111, 0b0000, successors)
+    assert len(path) == 8
+    assert path[0] == 0b1111 and path[-1] == 0b0000
+    for state1, state2 in zip(path, path[1:]):
+        assert state2 in successors(state1)
+    assert len(bidirectional_bfs(0b1111, 0b0000, successors)) == 8
+    assert astar(0b1111, 0b0000, successors, items_left)[0] == 7
+
+def test_searches_agree():
+    start = (0, 0)
+    goal = (19, 0)
+    length = len(bfs(start, goal, grid_successors))
+    assert length == 1 + 19 + 19 + 19
+    path = bidirectional_bfs(start, goal, grid_successors)
+    assert len(path) == length
+    assert path[0] == start and path[-1] == goal
+    for state1, state2 in zip(path, path[1:]):
+        assert state2 in grid_successors(state1)
+    manhattan = lambda state: abs(state[0] - goal[0]) + abs(state[1] - goal[1])
+    cost, path = astar(start, goal, grid_successors, manhattan)
+    assert cost == length - 1
+    assert len(path) == length
+    # moving up costs 3, so the detour is as cheap as possible
+    cost, _ = astar(start, goal, grid_successors, cost=lambda a, b: 3 if b[1] > a[1] else 1)
+    assert cost == 19 * 3 + 19 + 19
+
+def test_astar_inconsistent_heuristic():
+    # h(A) = 5 never overestimates but isn't consistent, B is first closed through the dearer S -> B
+    edges = {"S": {"A": 1, "B": 4}, "A": {"B": 1}, "B": {"G": 5}, "G": {}}
+    heuristic = {"S": 0, "A": 5, "B": 0, "G": 0}
+    assert astar("S", "G", edges.__getitem__, heuristic.__getitem__, lambda a, b: edges[a][b]) == (7, ["S", "A", "B", "G"])
+
+def test_unreachable():
+    successors = lambda state: [state + 1] if state < 5 else []
+    assert bfs(0, 9, successors) is None
+    assert bidirectional_bfs(0, 9, successors, lambda state: [state - 1] if 0 < state <= 5 else []) is None
+    assert astar(0, 9, successors) is None
+    assert bfs(3, 3, successors) == [3]
+    assert bidirectional_bfs(3, 3, successors) == [3]
@@ -1,30 +1,4 @@
-class GraphError(Exception):
-    pass
-
-class DirectedGraph:
-    def __init__(self):
-        self._d_out = {}
-
-    def add_vertex(self, vertex: int) -> bool:
-        if vertex not in self._d_out:
-            self._d_out[vertex] = []
-            return True
-        return False
-
-    def add_edge(self, vertex1: int, vertex2: int) -> bool:
-        if vertex1 not in self._d_out:
-            raise GraphError("vertex doesn't exist")
-        if vertex2 not in self._d_out:
-            raise GraphError("vertex doesn't exist")
-        if vertex2 in self._d_out[vertex1]:
-            return False
-        self._d_out[vertex1].append(vertex2)
-        return True
-
-    def outbound(self, vertex: int) -> iter:
-        if vertex not in self._d_out:
-            raise GraphError("vertex does not exist")
-        return iter(self._d_out[vertex])
+from state_space import bfs
 
 def valid(mask: int) -> bool:
     left = mask
@@ -41,20 +15,16 @@ def valid(mask: int) -> bool:
         return False
     return True
 
-def bfs(graph: DirectedGraph, start: int, end: int):
-    queue = [start]
-    distance = {start: 0}
-    previous = {start: None}
-    while queue:
-        current = queue.pop(0)
-        if current == end:
-            break
-        for neighbor in graph.outbound(current):
-            if neighbor not in distance:
-                distance[neighbor] = distance[current] + 1
-                previous[neighbor] = current
-                queue.append(neighbor)
-    return distance, previous
+def successors(state: int):
+    # the human crosses the river alone or with one item from its bank
+    bank = state if state & 0b1000 else ~state
+    for move in [0b1000] + [(1 << bit) | 0b1000 for bit in range(3) if bank & (1 << bit)]:
+        if valid(state ^ move):
+            yield state ^ move
+
+def items_left(state: int) -> int:
+    # every crossing takes at most one item to the right bank, so this never overestimates
+    return bin(state & 0b0111).count("1")
 
 def print_state(state: int):
     wolf = "wolf" if state & 0b0001 else ""
@@ -87,31 +57,13 @@ def main():
     # bit 3 - human
     # we start from the state 1111 (all on the left bank)
     # and end at the state 0000 (all on the right bank)
-    g = DirectedGraph()
-    for state1 in range(16):
-        if valid(state1):
-            g.add_vertex(state1)
-    for state1 in range(16):
-        if valid(state1):
-            state2 = state1 ^ 0b1000
-            if valid(state2):
-                g.add_edge(state1, state2)
-            for bit in range(3):
-                state2 = state1 ^ (1 << bit) ^ 0b1000
-                if valid(state2):
-                    g.add_edge(state1, state2)
-    distance, previous = bfs(g, 0b1111, 0b0000)
-    path = []
-    current = 0b0000
-    while current is not None:
-        path.append(current)
-        current = previous[current]
-    path.reverse()
+    # states are generated lazily by successors, the state graph is never built
+    path = bfs(0b1111, 0b0000, successors)
     print("solution:")
     for state in path:
         print_state(state)
         print()
-    print(f"{distance[0000]} steps")
+    print(f"{len(path) - 1} steps")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file